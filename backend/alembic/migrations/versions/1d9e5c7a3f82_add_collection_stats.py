@@ -0,0 +1,41 @@
+"""Add collection stats counters
+
+Revision ID: 1d9e5c7a3f82
+Revises: f71c3a58e2d4
+Create Date: 2026-10-16 15:30:48.771205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '1d9e5c7a3f82'
+down_revision = 'f71c3a58e2d4'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('user_collection_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('collected_coins', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('coin_catalog_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('active_coins', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("""
+        INSERT INTO user_collection_stats (user_id, collected_coins, updated_at)
+        SELECT user_id, count(*), now() FROM user_coin_collections WHERE is_active GROUP BY user_id
+    """)
+    op.execute("""
+        INSERT INTO coin_catalog_stats (id, active_coins)
+        SELECT 1, count(*) FROM coins WHERE is_active AND NOT is_deleted
+    """)
+
+def downgrade():
+    op.drop_table('coin_catalog_stats')
+    op.drop_table('user_collection_stats')
@@ -0,0 +1,40 @@
+"""Add full-text and trigram search on STT/TTS text
+
+Revision ID: 5e1f0a9c3b27
+Revises: bc83914b8fb2
+Create Date: 2026-10-16 12:20:07.318544
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '5e1f0a9c3b27'
+down_revision = 'bc83914b8fb2'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table in ('stts', 'ttss'):
+        # Stored generated column: filled for existing rows here (rewrites the
+        # table) and recomputed by PostgreSQL whenever text changes
+        op.add_column(table, sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', text)", persisted=True),
+            nullable=True
+        ))
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], unique=False, postgresql_using='gin')
+        # Substring (ILIKE '%q%') matches
+        op.create_index(
+            f'ix_{table}_text_trgm', table, ['text'], unique=False,
+            postgresql_using='gin', postgresql_ops={'text': 'gin_trgm_ops'}
+        )
+
+def downgrade():
+    for table in ('ttss', 'stts'):
+        op.drop_index(f'ix_{table}_text_trgm', table_name=table)
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,31 @@
+"""Add guest coin collections
+
+Revision ID: 7b3f9e1d2c08
+Revises: 1d9e5c7a3f82
+Create Date: 2026-10-16 16:12:27.045931
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '7b3f9e1d2c08'
+down_revision = '1d9e5c7a3f82'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('guest_coin_collections',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('guest_token', sa.String(length=64), nullable=False),
+    sa.Column('coin_id', sa.Integer(), nullable=False),
+    sa.Column('collected_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['coin_id'], ['coins.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('guest_token', 'coin_id', name='uq_guest_coin_collections_guest_coin')
+    )
+    op.create_index(op.f('ix_guest_coin_collections_id'), 'guest_coin_collections', ['id'], unique=False)
+
+def downgrade():
+    op.drop_index(op.f('ix_guest_coin_collections_id'), table_name='guest_coin_collections')
+    op.drop_table('guest_coin_collections')
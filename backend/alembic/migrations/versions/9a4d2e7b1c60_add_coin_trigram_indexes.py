@@ -0,0 +1,26 @@
+"""Add trigram indexes for coin search
+
+Revision ID: 9a4d2e7b1c60
+Revises: 5e1f0a9c3b27
+Create Date: 2026-10-16 12:58:33.904172
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '9a4d2e7b1c60'
+down_revision = '5e1f0a9c3b27'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in ('name', 'symbol', 'description'):
+        op.create_index(
+            f'ix_coins_{column}_trgm', 'coins', [column], unique=False,
+            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+def downgrade():
+    for column in ('description', 'symbol', 'name'):
+        op.drop_index(f'ix_coins_{column}_trgm', table_name='coins')
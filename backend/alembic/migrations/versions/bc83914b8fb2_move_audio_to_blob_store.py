@@ -0,0 +1,47 @@
+"""Move audio to blob store
+
+Revision ID: bc83914b8fb2
+Revises: be7d1c3da1d9
+Create Date: 2026-10-16 11:04:18.227950
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'bc83914b8fb2'
+down_revision = 'be7d1c3da1d9'
+branch_labels = None
+depends_on = None
+
+# Existing clips stay in the audio column until moved with
+# `python -m app.services.storage.migrate_audio`; the column can be dropped
+# in a later revision once every row has an audio_sha256.
+
+def upgrade():
+    for table in ('stts', 'ttss'):
+        op.add_column(table, sa.Column('audio_sha256', sa.String(length=64), nullable=True))
+        op.add_column(table, sa.Column('audio_size', sa.Integer(), nullable=True))
+        op.add_column(table, sa.Column('audio_mime_type', sa.String(), nullable=True))
+        op.add_column(table, sa.Column('audio_duration_ms', sa.Integer(), nullable=True))
+        op.create_index(op.f(f'ix_{table}_audio_sha256'), table, ['audio_sha256'], unique=False)
+        op.alter_column(table, 'audio', existing_type=sa.LargeBinary(), nullable=True)
+
+def downgrade():
+    # Rows whose audio only exists in the blob store cannot satisfy NOT NULL
+    # again; refuse rather than drop them
+    bind = op.get_bind()
+    for table in ('ttss', 'stts'):
+        missing = bind.execute(sa.text(f"SELECT count(*) FROM {table} WHERE audio IS NULL")).scalar()
+        if missing:
+            raise RuntimeError(
+                f"{missing} {table} rows keep their audio only in the blob store; run "
+                "`python -m app.services.storage.migrate_audio --restore` before downgrading"
+            )
+    for table in ('ttss', 'stts'):
+        op.alter_column(table, 'audio', existing_type=sa.LargeBinary(), nullable=False)
+        op.drop_index(op.f(f'ix_{table}_audio_sha256'), table_name=table)
+        op.drop_column(table, 'audio_duration_ms')
+        op.drop_column(table, 'audio_mime_type')
+        op.drop_column(table, 'audio_size')
+        op.drop_column(table, 'audio_sha256')
@@ -0,0 +1,23 @@
+"""Add keyset pagination indexes
+
+Revision ID: be7d1c3da1d9
+Revises: d17a6f102060
+Create Date: 2026-10-16 09:12:41.503118
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'be7d1c3da1d9'
+down_revision = 'd17a6f102060'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Newest-first listings seek on (user_id, created_at, id)
+    op.create_index('ix_stts_user_created_id', 'stts', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_ttss_user_created_id', 'ttss', ['user_id', 'created_at', 'id'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_ttss_user_created_id', table_name='ttss')
+    op.drop_index('ix_stts_user_created_id', table_name='stts')
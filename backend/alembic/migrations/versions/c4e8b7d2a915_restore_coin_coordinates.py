@@ -0,0 +1,25 @@
+"""Restore coin coordinates
+
+Revision ID: c4e8b7d2a915
+Revises: 9a4d2e7b1c60
+Create Date: 2026-10-16 13:41:52.660318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8b7d2a915'
+down_revision = '9a4d2e7b1c60'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Dropped by d17a6f102060; no B-tree indexes this time, radius queries
+    # are answered from the in-process grid in CoinService
+    op.add_column('coins', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('coins', sa.Column('longitude', sa.Float(), nullable=True))
+
+def downgrade():
+    op.drop_column('coins', 'longitude')
+    op.drop_column('coins', 'latitude')
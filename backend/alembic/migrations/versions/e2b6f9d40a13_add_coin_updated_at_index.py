@@ -0,0 +1,21 @@
+"""Add coin updated_at index for delta sync
+
+Revision ID: e2b6f9d40a13
+Revises: c4e8b7d2a915
+Create Date: 2026-10-16 14:22:10.517839
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e2b6f9d40a13'
+down_revision = 'c4e8b7d2a915'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # GET /coins/changes seeks on (updated_at, id)
+    op.create_index('ix_coins_updated_at_id', 'coins', ['updated_at', 'id'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_coins_updated_at_id', table_name='coins')
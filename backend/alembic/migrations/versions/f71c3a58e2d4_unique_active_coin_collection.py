@@ -0,0 +1,38 @@
+"""Unique active coin collection per user
+
+Revision ID: f71c3a58e2d4
+Revises: e2b6f9d40a13
+Create Date: 2026-10-16 14:55:36.402718
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f71c3a58e2d4'
+down_revision = 'e2b6f9d40a13'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Earlier racing collects may have left duplicates; keep the first of each
+    op.execute("""
+        UPDATE user_coin_collections SET is_active = false
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY user_id, coin_id ORDER BY collected_at, id
+                ) AS position
+                FROM user_coin_collections
+                WHERE is_active
+            ) ranked
+            WHERE position > 1
+        )
+    """)
+    op.create_index(
+        'uq_user_coin_collections_active', 'user_coin_collections', ['user_id', 'coin_id'],
+        unique=True, postgresql_where=sa.text('is_active')
+    )
+
+def downgrade():
+    op.drop_index('uq_user_coin_collections_active', table_name='user_coin_collections')
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
-from app.core import get_db, get_current_user
-from app.database.models import User
-from .schema import LoginRequest, RegisterRequest, TokenResponse, RefreshTokenRequest, UserInfo
+from app.core import get_async_db, get_current_user, optional_oauth2_scheme
+from app.core.user_cache import CurrentUser
+from .schema import LoginRequest, RegisterRequest, TokenResponse, RefreshTokenRequest, LogoutRequest, UserInfo
 from .service import AuthService
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -13,51 +14,51 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 @router.post("/token", response_model=TokenResponse)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     OAuth2 compatible token login, get an access token for future requests
     """
     login_data = LoginRequest(username=form_data.username, password=form_data.password)
-    return AuthService.login(db, login_data)
+    return await AuthService.login(db, login_data)
 
 
 @router.post("/login", response_model=TokenResponse)
 async def login(
     login_data: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Login user and return access and refresh tokens
     """
-    return AuthService.login(db, login_data)
+    return await AuthService.login(db, login_data)
 
 
 @router.post("/register", response_model=TokenResponse)
 async def register(
     register_data: RegisterRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Register new user and return access and refresh tokens
     """
-    return AuthService.register(db, register_data)
+    return await AuthService.register(db, register_data)
 
 
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh_token(
     refresh_data: RefreshTokenRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Refresh access token using refresh token
     """
-    return AuthService.refresh_access_token(db, refresh_data)
+    return await AuthService.refresh_access_token(db, refresh_data)
 
 
 @router.get("/me", response_model=UserInfo)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get current user information
@@ -66,8 +67,12 @@ async def get_current_user_info(
 
 
 @router.post("/logout")
-async def logout():
+async def logout(
+    logout_data: Optional[LogoutRequest] = None,
+    token: Optional[str] = Depends(optional_oauth2_scheme)
+):
     """
-    Logout user (client should remove tokens)
+    Logout user: revokes the bearer access token and the refresh token in the body, if any
     """
+    await AuthService.logout(token, logout_data)
     return {"message": "Successfully logged out"}
@@ -1,27 +1,31 @@
 from datetime import timedelta
 from typing import Optional
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
 from app.core.security import (
     authenticate_user, 
-    get_password_hash, 
+    get_password_hash_async,
     create_access_token, 
     create_refresh_token,
-    decode_refresh_token
+    decode_refresh_token,
+    ensure_not_revoked,
+    revoke_token
 )
 from app.core.config import get_settings
+from app.core.counting import count_cache
 from app.database.models import User
-from .schema import LoginRequest, RegisterRequest, TokenResponse, RefreshTokenRequest
+from .schema import LoginRequest, RegisterRequest, TokenResponse, RefreshTokenRequest, LogoutRequest
 
 settings = get_settings()
 
 
 class AuthService:
     @staticmethod
-    def login(db: Session, login_data: LoginRequest) -> TokenResponse:
+    async def login(db: AsyncSession, login_data: LoginRequest) -> TokenResponse:
         """Authenticate user and return tokens"""
-        user = authenticate_user(db, login_data.username, login_data.password)
+        user = await authenticate_user(db, login_data.username, login_data.password)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -54,16 +58,17 @@ class AuthService:
         )
     
     @staticmethod
-    def register(db: Session, register_data: RegisterRequest) -> TokenResponse:
+    async def register(db: AsyncSession, register_data: RegisterRequest) -> TokenResponse:
         """Register new user and return tokens"""
-        existing_user = db.query(User).filter(User.username == register_data.username).first()
+        result = await db.execute(select(User).where(User.username == register_data.username))
+        existing_user = result.scalars().first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already registered"
             )
         
-        hashed_password = get_password_hash(register_data.password)
+        hashed_password = await get_password_hash_async(register_data.password)
         new_user = User(
             username=register_data.username,
             hashed_password=hashed_password,
@@ -74,8 +79,9 @@ class AuthService:
         )
         
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        count_cache.invalidate("users")
+        await db.refresh(new_user)
 
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         refresh_token_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
@@ -97,10 +103,11 @@ class AuthService:
         )
     
     @staticmethod
-    def refresh_access_token(db: Session, refresh_data: RefreshTokenRequest) -> TokenResponse:
+    async def refresh_access_token(db: AsyncSession, refresh_data: RefreshTokenRequest) -> TokenResponse:
         """Generate new access token using refresh token"""
         try:
             payload = decode_refresh_token(refresh_data.refresh_token)
+            await ensure_not_revoked(payload)
             user_id = payload.get("sub")
             
             if user_id is None:
@@ -109,7 +116,8 @@ class AuthService:
                     detail="Invalid refresh token"
                 )
             
-            user = db.query(User).filter(User.id == int(user_id)).first()
+            result = await db.execute(select(User).where(User.id == int(user_id)))
+            user = result.scalars().first()
             if not user or not user.is_active:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -140,3 +148,11 @@ class AuthService:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token"
             )
+    
+    @staticmethod
+    async def logout(access_token: Optional[str], logout_data: Optional[LogoutRequest]) -> None:
+        """Revoke the presented access token and, if given, the refresh token"""
+        if access_token:
+            await revoke_token(access_token)
+        if logout_data and logout_data.refresh_token:
+            await revoke_token(logout_data.refresh_token)
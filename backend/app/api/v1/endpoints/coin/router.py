@@ -1,25 +1,29 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 
-from app.core import get_db, get_current_user
-from app.database.models import User
-from .schema import CoinCreate, CoinUpdate, CoinResponse, CoinList
+from app.core import get_async_db, get_async_read_db, get_current_user
+from app.core.config import get_settings
+from app.core.http_cache import etag_matches
+from app.core.counting import CountMode
+from app.core.user_cache import CurrentUser
+from .schema import CoinCreate, CoinUpdate, CoinResponse, CoinList, NearbyCoin, CoinChanges
 from .service import CoinService
 
 router = APIRouter(prefix="/coins", tags=["Coins"])
+settings = get_settings()
 
 
 @router.post("/", response_model=CoinResponse)
 async def create_coin(
     coin_data: CoinCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Create a new coin
     """
-    return CoinService.create_coin(db, coin_data)
+    return await CoinService.create_coin(db, coin_data)
 
 
 @router.get("/", response_model=CoinList)
@@ -28,70 +32,110 @@ async def get_coins(
     size: int = Query(10, ge=1, le=100, description="Page size"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     search: Optional[str] = Query(None, description="Search by name, symbol or description"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor; overrides page"),
+    include_total: bool = Query(True, description="Compute the total count"),
+    count_mode: CountMode = Query(CountMode.exact, description="exact (cached) or estimated (planner statistics)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get coins with pagination and filtering
     """
-    return CoinService.get_coins(db, page, size, is_active, search)
+    return await CoinService.get_coins(db, page, size, is_active, search, cursor, include_total, count_mode)
 
 
 @router.get("/ar", response_model=List[CoinResponse])
 async def get_coins_for_ar(
-    db: Session = Depends(get_db)
+    request: Request,
+    # The snapshot is rebuilt right after an invalidation, so it must read the primary, not a lagging replica
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all active coins with AR models for AR functionality (public endpoint)
+
+    Served from an in-memory snapshot; send If-None-Match with the last ETag to get 304 when unchanged.
+    """
+    body, etag = await CoinService.get_ar_catalog(db)
+    headers = {"ETag": etag, "Cache-Control": "public, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/changes", response_model=CoinChanges)
+async def get_coin_changes(
+    since: Optional[str] = Query(None, description="next_token from the previous sync; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=2000, description="Maximum number of changes"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Get coins changed since the last sync, with soft-deleted coin ids as tombstones
+    """
+    return await CoinService.get_coin_changes(db, since, limit)
+
+
+@router.get("/nearby", response_model=List[NearbyCoin])
+async def get_nearby_coins(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+    radius_m: float = Query(500, gt=0, le=settings.NEARBY_MAX_RADIUS_M, description="Search radius in meters"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of coins"),
+    # The grid reloads on its own primary session; only the row lookup uses this one
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Get active coins around a point, closest first (public endpoint)
     """
-    return CoinService.get_active_coins_for_ar(db)
+    return await CoinService.get_nearby_coins(db, lat, lon, radius_m, limit)
 
 
 @router.get("/symbol/{symbol}", response_model=CoinResponse)
 async def get_coin_by_symbol(
     symbol: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get coin by symbol
     """
-    return CoinService.get_coin_by_symbol(db, symbol)
+    return await CoinService.get_coin_by_symbol(db, symbol)
 
 
 @router.get("/{coin_id}", response_model=CoinResponse)
 async def get_coin(
     coin_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get coin by ID
     """
-    return CoinService.get_coin(db, coin_id)
+    return await CoinService.get_coin(db, coin_id)
 
 
 @router.put("/{coin_id}", response_model=CoinResponse)
 async def update_coin(
     coin_id: int,
     coin_data: CoinUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Update coin by ID
     """
-    return CoinService.update_coin(db, coin_id, coin_data)
+    return await CoinService.update_coin(db, coin_id, coin_data)
 
 
 @router.delete("/{coin_id}")
 async def delete_coin(
     coin_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Delete coin by ID (soft delete)
     """
-    CoinService.delete_coin(db, coin_id)
+    await CoinService.delete_coin(db, coin_id)
     return {"message": "Coin deleted successfully"}
@@ -14,6 +14,9 @@ class CoinBase(BaseModel):
     ar_position_x: Optional[float] = Field(0.0)
     ar_position_y: Optional[float] = Field(0.0)
     ar_position_z: Optional[float] = Field(0.0)
+    
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 
 class CoinCreate(CoinBase):
@@ -29,6 +32,8 @@ class CoinUpdate(BaseModel):
     ar_position_x: Optional[float] = None
     ar_position_y: Optional[float] = None
     ar_position_z: Optional[float] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     is_active: Optional[bool] = None
 
 
@@ -45,7 +50,20 @@ class CoinResponse(CoinBase):
 
 class CoinList(BaseModel):
     coins: List[CoinResponse]
-    total: int
+    total: Optional[int] = None  # omitted when include_total=false
+    total_is_estimate: bool = False
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class NearbyCoin(CoinResponse):
+    distance_m: float
+
+
+class CoinChanges(BaseModel):
+    changes: List[CoinResponse]  # created or updated coins, including deactivated ones
+    deleted: List[int]  # ids of soft-deleted coins
+    next_token: Optional[str] = None  # pass as ?since= on the next call; unchanged when nothing changed
+    has_more: bool = False
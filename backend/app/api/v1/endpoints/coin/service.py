@@ -1,18 +1,121 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from datetime import timedelta
+import asyncio
+import hashlib
+import time
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
+from sqlalchemy import DateTime, cast, func, or_, select, tuple_
 import math
 
+from app.core.config import get_settings
+from app.core.counting import CountMode, count_cache, count_rows
+from app.core.database import AsyncSessionLocal
+from app.core.pagination import decode_cursor, encode_cursor, next_cursor_for
+from app.core.spatial import GeoGrid
 from app.database.models import Coin
-from .schema import CoinCreate, CoinUpdate, CoinResponse, CoinList
+from app.services.collection_stats import bump_active_coins
+from .schema import CoinCreate, CoinUpdate, CoinResponse, CoinList, NearbyCoin, CoinChanges
+
+settings = get_settings()
+
+
+class CoinLocations:
+    """Per-worker spatial index of active coins that have coordinates.
+
+    Writes in this worker update it immediately; it is also reloaded from
+    the database every NEARBY_INDEX_REFRESH_SECONDS to pick up changes made
+    by other workers. Reloads open their own primary session: a lagging
+    replica would bring back coins this worker has just deleted or
+    deactivated, while requests themselves can stay on a replica.
+    """
+
+    def __init__(self, cell_degrees: float, refresh_seconds: float):
+        self.grid = GeoGrid(cell_degrees)
+        self.refresh_seconds = refresh_seconds
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def update(self, coin: Coin):
+        if coin.is_active and not coin.is_deleted and coin.latitude is not None and coin.longitude is not None:
+            self.grid.upsert(coin.id, coin.latitude, coin.longitude)
+        else:
+            self.grid.remove(coin.id)
+
+    async def ensure_fresh(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(Coin.id, Coin.latitude, Coin.longitude).where(
+                    Coin.is_deleted == False,
+                    Coin.is_active == True,
+                    Coin.latitude.isnot(None),
+                    Coin.longitude.isnot(None)
+                ))
+            self.grid.replace_all(result.all())
+            self._loaded_at = time.monotonic()
+
+
+coin_locations = CoinLocations(
+    cell_degrees=settings.NEARBY_GRID_CELL_DEGREES,
+    refresh_seconds=settings.NEARBY_INDEX_REFRESH_SECONDS,
+)
+
+
+class ArCatalog:
+    """Pre-serialized ``GET /coins/ar`` response.
+
+    The JSON body is encoded once per ``version`` and served as bytes with a
+    strong ETag derived from its content, so every worker holding the same
+    catalog hands out the same ETag. Coin writes in this worker bump the
+    version; the snapshot is also rebuilt every AR_CATALOG_REFRESH_SECONDS
+    to pick up other workers' writes. Rebuilds read from the primary: a
+    replica may not have the write that bumped the version yet, and the
+    stale body would then be cached as the new version.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.version = 0
+        self.body = b""
+        self.etag = ""
+        self._built_version: Optional[int] = None
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+        self._adapter = TypeAdapter(List[CoinResponse])
+
+    def invalidate(self):
+        self.version += 1
+
+    def _is_fresh(self) -> bool:
+        return self._built_version == self.version and time.monotonic() - self._built_at < self.refresh_seconds
+
+    async def snapshot(self, db: AsyncSession) -> Tuple[bytes, str]:
+        if not self._is_fresh():
+            async with self._lock:
+                if not self._is_fresh():
+                    version = self.version
+                    coins = await CoinService.get_active_coins_for_ar(db)
+                    body = self._adapter.dump_json(coins)
+                    self.body, self.etag = body, f'"{hashlib.sha256(body).hexdigest()}"'
+                    # A write during the rebuild leaves the snapshot stale for the next request
+                    self._built_version, self._built_at = version, time.monotonic()
+        return self.body, self.etag
+
+
+ar_catalog = ArCatalog(refresh_seconds=settings.AR_CATALOG_REFRESH_SECONDS)
 
 
 class CoinService:
     @staticmethod
-    def create_coin(db: Session, coin_data: CoinCreate) -> CoinResponse:
+    async def create_coin(db: AsyncSession, coin_data: CoinCreate) -> CoinResponse:
         """Create a new coin"""
-        existing_coin = db.query(Coin).filter(Coin.symbol == coin_data.symbol).first()
+        result = await db.execute(select(Coin).where(Coin.symbol == coin_data.symbol))
+        existing_coin = result.scalars().first()
         if existing_coin:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -28,23 +131,30 @@ class CoinService:
             ar_position_x=coin_data.ar_position_x,
             ar_position_y=coin_data.ar_position_y,
             ar_position_z=coin_data.ar_position_z,
+            latitude=coin_data.latitude,
+            longitude=coin_data.longitude,
             is_active=True,
             is_deleted=False
         )
         
         db.add(new_coin)
-        db.commit()
-        db.refresh(new_coin)
+        await bump_active_coins(db, 1)
+        await db.commit()
+        count_cache.invalidate("coins")
+        await db.refresh(new_coin)
+        coin_locations.update(new_coin)
+        ar_catalog.invalidate()
         
         return CoinResponse.model_validate(new_coin)
     
     @staticmethod
-    def get_coin(db: Session, coin_id: int) -> CoinResponse:
+    async def get_coin(db: AsyncSession, coin_id: int) -> CoinResponse:
         """Get coin by ID"""
-        coin = db.query(Coin).filter(
+        result = await db.execute(select(Coin).where(
             Coin.id == coin_id, 
             Coin.is_deleted == False
-        ).first()
+        ))
+        coin = result.scalars().first()
         
         if not coin:
             raise HTTPException(
@@ -55,49 +165,107 @@ class CoinService:
         return CoinResponse.model_validate(coin)
     
     @staticmethod
-    def get_coins(
-        db: Session, 
+    async def get_coins(
+        db: AsyncSession, 
         page: int = 1, 
         size: int = 10,
         is_active: Optional[bool] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        count_mode: CountMode = CountMode.exact
     ) -> CoinList:
-        """Get coins with pagination and filtering"""
-        query = db.query(Coin).filter(Coin.is_deleted == False)
+        """Get coins with pagination and filtering.
+
+        With ``cursor`` the page is located by keyset on ``id`` instead of
+        OFFSET, so deep pages cost the same as the first one.
+
+        ``search`` matching a symbol exactly returns just that coin. Otherwise
+        it matches substrings of name, symbol or description (served by the
+        trigram indexes) and orders results by similarity, best first.
+        """
+        query = select(Coin).where(Coin.is_deleted == False)
         
         if is_active is not None:
-            query = query.filter(Coin.is_active == is_active)
+            query = query.where(Coin.is_active == is_active)
         
+        rank = None
         if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                (Coin.name.ilike(search_filter)) | 
-                (Coin.symbol.ilike(search_filter)) |
-                (Coin.description.ilike(search_filter))
+            exact = await db.scalar(query.where(Coin.symbol == search.strip().upper()))
+            if exact is not None:
+                # A single result: pages after the first are empty
+                coins = [exact] if page == 1 and not cursor else []
+                return CoinList(
+                    coins=[CoinResponse.model_validate(coin) for coin in coins],
+                    total=1 if include_total else None,
+                    page=page,
+                    size=size,
+                    pages=1 if include_total else None
+                )
+            query = query.where(or_(
+                Coin.name.icontains(search, autoescape=True),
+                Coin.symbol.icontains(search, autoescape=True),
+                Coin.description.icontains(search, autoescape=True)
+            ))
+            rank = func.greatest(
+                func.similarity(Coin.name, search),
+                func.similarity(Coin.symbol, search),
+                func.coalesce(func.word_similarity(search, Coin.description), 0)
             )
         
-        total = query.count()
+        total = None
+        total_is_estimate = False
+        if include_total:
+            total, total_is_estimate = await count_rows(
+                db, query, "coins",
+                mode=count_mode
+            )
         
-        offset = (page - 1) * size
-        coins = query.offset(offset).limit(size).all()
+        if rank is None:
+            query = query.order_by(Coin.id)
+            if cursor:
+                query = query.where(Coin.id > decode_cursor(cursor, "id")["id"])
+        else:
+            query = query.add_columns(rank.label("rank")).order_by(rank.desc(), Coin.id.desc())
+            if cursor:
+                after = decode_cursor(cursor, "rank", "id")
+                query = query.where(tuple_(rank, Coin.id) < (float(after["rank"]), after["id"]))
+        if not cursor:
+            query = query.offset((page - 1) * size)
+        result = await db.execute(query.limit(size + 1))
         
-        pages = math.ceil(total / size) if total > 0 else 1
+        if rank is None:
+            coins = result.scalars().all()
+            next_cursor = next_cursor_for(coins, size, "id")
+        else:
+            rows = result.all()
+            coins = [row.Coin for row in rows]
+            next_cursor = None
+            if len(rows) > size:
+                next_cursor = encode_cursor({"rank": rows[size - 1].rank, "id": rows[size - 1].Coin.id})
+        
+        pages = None
+        if total is not None:
+            pages = math.ceil(total / size) if total > 0 else 1
         
         return CoinList(
-            coins=[CoinResponse.model_validate(coin) for coin in coins],
+            coins=[CoinResponse.model_validate(coin) for coin in coins[:size]],
             total=total,
+            total_is_estimate=total_is_estimate,
             page=page,
             size=size,
-            pages=pages
+            pages=pages,
+            next_cursor=next_cursor
         )
     
     @staticmethod
-    def update_coin(db: Session, coin_id: int, coin_data: CoinUpdate) -> CoinResponse:
+    async def update_coin(db: AsyncSession, coin_id: int, coin_data: CoinUpdate) -> CoinResponse:
         """Update coin by ID"""
-        coin = db.query(Coin).filter(
+        result = await db.execute(select(Coin).where(
             Coin.id == coin_id, 
             Coin.is_deleted == False
-        ).first()
+        ).with_for_update())
+        coin = result.scalars().first()
         
         if not coin:
             raise HTTPException(
@@ -107,32 +275,39 @@ class CoinService:
 
         # Проверяем уникальность символа при обновлении
         if coin_data.symbol and coin_data.symbol != coin.symbol:
-            existing_coin = db.query(Coin).filter(
+            result = await db.execute(select(Coin).where(
                 Coin.symbol == coin_data.symbol,
                 Coin.id != coin_id
-            ).first()
+            ))
+            existing_coin = result.scalars().first()
             if existing_coin:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Coin with this symbol already exists"
                 )
 
+        was_active = coin.is_active
         update_data = coin_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(coin, field, value)
         
-        db.commit()
-        db.refresh(coin)
+        await bump_active_coins(db, int(coin.is_active) - int(was_active))
+        await db.commit()
+        count_cache.invalidate("coins")
+        await db.refresh(coin)
+        coin_locations.update(coin)
+        ar_catalog.invalidate()
         
         return CoinResponse.model_validate(coin)
     
     @staticmethod
-    def delete_coin(db: Session, coin_id: int) -> bool:
+    async def delete_coin(db: AsyncSession, coin_id: int) -> bool:
         """Soft delete coin by ID"""
-        coin = db.query(Coin).filter(
+        result = await db.execute(select(Coin).where(
             Coin.id == coin_id, 
             Coin.is_deleted == False
-        ).first()
+        ).with_for_update())
+        coin = result.scalars().first()
         
         if not coin:
             raise HTTPException(
@@ -140,20 +315,26 @@ class CoinService:
                 detail="Coin not found"
             )
         
+        was_active = coin.is_active
         coin.is_deleted = True
         coin.is_active = False
         
-        db.commit()
+        await bump_active_coins(db, -int(was_active))
+        await db.commit()
+        count_cache.invalidate("coins")
+        coin_locations.update(coin)
+        ar_catalog.invalidate()
         return True
     
     @staticmethod
-    def get_coin_by_symbol(db: Session, symbol: str) -> CoinResponse:
+    async def get_coin_by_symbol(db: AsyncSession, symbol: str) -> CoinResponse:
         """Get coin by symbol"""
-        coin = db.query(Coin).filter(
+        result = await db.execute(select(Coin).where(
             Coin.symbol == symbol.upper(),
             Coin.is_deleted == False,
             Coin.is_active == True
-        ).first()
+        ))
+        coin = result.scalars().first()
         
         if not coin:
             raise HTTPException(
@@ -164,12 +345,89 @@ class CoinService:
         return CoinResponse.model_validate(coin)
     
     @staticmethod
-    def get_active_coins_for_ar(db: Session) -> List[CoinResponse]:
+    async def get_active_coins_for_ar(db: AsyncSession) -> List[CoinResponse]:
         """Get all active coins for AR functionality"""
-        coins = db.query(Coin).filter(
+        result = await db.execute(select(Coin).where(
             Coin.is_deleted == False,
             Coin.is_active == True,
             Coin.ar_model_url.isnot(None)
-        ).all()
+        ))
+        coins = result.scalars().all()
         
         return [CoinResponse.model_validate(coin) for coin in coins]
+    
+    @staticmethod
+    async def get_ar_catalog(db: AsyncSession) -> Tuple[bytes, str]:
+        """Pre-encoded JSON of get_active_coins_for_ar and its ETag"""
+        return await ar_catalog.snapshot(db)
+    
+    @staticmethod
+    async def get_nearby_coins(
+        db: AsyncSession,
+        lat: float,
+        lon: float,
+        radius_m: float,
+        limit: int = 50
+    ) -> List[NearbyCoin]:
+        """Active coins within ``radius_m`` meters of a point, closest first"""
+        await coin_locations.ensure_fresh()
+        matches = coin_locations.grid.nearby(lat, lon, radius_m, limit)
+        if not matches:
+            return []
+        
+        result = await db.execute(select(Coin).where(
+            Coin.id.in_([coin_id for coin_id, _ in matches]),
+            Coin.is_deleted == False,
+            Coin.is_active == True
+        ))
+        coins = {coin.id: coin for coin in result.scalars().all()}
+        
+        # Coins changed by another worker since the last refresh drop out here
+        return [
+            NearbyCoin(**CoinResponse.model_validate(coins[coin_id]).model_dump(), distance_m=round(distance, 1))
+            for coin_id, distance in matches
+            if coin_id in coins
+        ]
+    
+    @staticmethod
+    async def get_coin_changes(db: AsyncSession, since: Optional[str] = None, limit: int = 500) -> CoinChanges:
+        """Coins created, updated or soft-deleted after the ``since`` token.
+
+        Without a token every live coin is returned. Changes come in
+        (updated_at, id) order; with ``has_more`` the client should call
+        again with ``next_token`` right away. A final page never advances its
+        token past COIN_CHANGES_OVERLAP_SECONDS before the database's now,
+        because a transaction can commit after a later-stamped one; changes
+        inside that window are sent again until they age out of it (clients
+        apply changes as upserts), and a quiet catalog yields empty deltas.
+        """
+        query = select(Coin)
+        if since:
+            after = decode_cursor(since, "updated_at", "id")
+            query = query.where(tuple_(Coin.updated_at, Coin.id) > (after["updated_at"], after["id"]))
+        else:
+            query = query.where(Coin.is_deleted == False)
+        result = await db.execute(query.order_by(Coin.updated_at, Coin.id).limit(limit + 1))
+        coins = result.scalars().all()
+        
+        has_more = len(coins) > limit
+        coins = coins[:limit]
+        if has_more:
+            next_token = encode_cursor({"updated_at": coins[-1].updated_at, "id": coins[-1].id})
+        elif coins:
+            # Same clock and type as the column default (func.now() stored as a naive timestamp)
+            db_now = await db.scalar(select(cast(func.now(), DateTime)))
+            settled = db_now - timedelta(seconds=settings.COIN_CHANGES_OVERLAP_SECONDS)
+            if coins[-1].updated_at <= settled:
+                next_token = encode_cursor({"updated_at": coins[-1].updated_at, "id": coins[-1].id})
+            else:
+                next_token = encode_cursor({"updated_at": settled, "id": 0})
+        else:
+            next_token = since
+        
+        return CoinChanges(
+            changes=[CoinResponse.model_validate(coin) for coin in coins if not coin.is_deleted],
+            deleted=[coin.id for coin in coins if coin.is_deleted],
+            next_token=next_token,
+            has_more=has_more
+        )
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from app.core import get_db, get_current_user
-from app.database.models import User
-from .schema import CoinCollectionCreate, CoinCollectionResponse, UserCoinCollectionSummary
+from app.core import get_async_db, get_async_read_db, get_current_user
+from app.core.user_cache import CurrentUser
+from app.services.guest_collections import guest_collection_buffer
+from .schema import CoinCollectionCreate, CoinCollectionResponse, UserCoinCollectionSummary, CoinCollectBatchRequest, CoinCollectBatchResponse, Leaderboard
 from .service import CoinCollectionService
 
 router = APIRouter(prefix="/coin-collections", tags=["Coin Collections"])
@@ -12,65 +13,99 @@ router = APIRouter(prefix="/coin-collections", tags=["Coin Collections"])
 @router.post("/", response_model=CoinCollectionResponse)
 async def collect_coin(
     collection_data: CoinCollectionCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Collect a coin for the current user
     """
-    return CoinCollectionService.collect_coin(db, current_user.id, collection_data)
+    return await CoinCollectionService.collect_coin(db, current_user.id, collection_data)
+
+@router.post("/batch", response_model=CoinCollectBatchResponse)
+async def collect_coins(
+    batch: CoinCollectBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Collect several coins for the current user, e.g. pickups queued during an AR session
+    """
+    return await CoinCollectionService.collect_coins(db, current_user.id, batch)
 
 @router.get("/", response_model=List[CoinCollectionResponse])
 async def get_user_collections(
     limit: int = 50,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get current user's coin collections
     """
-    return CoinCollectionService.get_user_collections(db, current_user.id, limit)
+    return await CoinCollectionService.get_user_collections(db, current_user.id, limit)
 
 @router.get("/summary", response_model=UserCoinCollectionSummary)
 async def get_user_collection_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get current user's collection summary with statistics
     """
-    return CoinCollectionService.get_user_collection_summary(db, current_user.id)
+    return await CoinCollectionService.get_user_collection_summary(db, current_user.id)
+
+@router.get("/leaderboard", response_model=Leaderboard)
+async def get_leaderboard(
+    limit: int = Query(20, ge=1, le=100, description="Number of top collectors"),
+    # Periodic rebuilds must read the primary, not a replica that lags this worker's own updates
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Get the top collectors by unique coins and the current user's rank
+    """
+    return await CoinCollectionService.get_leaderboard(db, current_user.id, limit)
 
 @router.get("/collected-ids", response_model=List[int])
 async def get_collected_coin_ids(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get list of collected coin IDs for the current user
     """
-    return CoinCollectionService.get_collected_coin_ids(db, current_user.id)
+    return await CoinCollectionService.get_collected_coin_ids(db, current_user.id)
 
 @router.delete("/{collection_id}")
 async def remove_collection(
     collection_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Remove a coin collection (soft delete)
     """
-    CoinCollectionService.remove_collection(db, current_user.id, collection_id)
+    await CoinCollectionService.remove_collection(db, current_user.id, collection_id)
     return {"message": "Collection removed successfully"}
 
 @router.post("/public", response_model=dict)
 async def collect_coin_public(
     collection_data: CoinCollectionCreate,
-    db: Session = Depends(get_db)
+    guest_token: Optional[str] = Header(None, alias="X-Guest-Token", max_length=64)
 ):
     """
     Collect a coin (public endpoint for AR functionality)
+
+    Pickups from clients sending an ``X-Guest-Token`` device token are queued
+    and written to guest_coin_collections in the background; 503 with
+    Retry-After when the queue is full.
     """
-    # For public collection, we'll use a default user ID or create a guest user
-    # For now, let's just return success without actually storing
-    return {"success": True, "message": "Coin collected successfully"}
+    if not guest_token:
+        # Older clients without a device token: nothing to key the pickup by
+        return {"success": True, "message": "Coin collected successfully", "queued": False}
+    if not guest_collection_buffer.offer(guest_token, collection_data.coin_id):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many pending collections, retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    return {"success": True, "message": "Coin collected successfully", "queued": True}
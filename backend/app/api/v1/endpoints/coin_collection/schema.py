@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from enum import Enum
 from typing import Optional
 
 class CoinCollectionCreate(BaseModel):
@@ -24,3 +25,35 @@ class UserCoinCollectionSummary(BaseModel):
     user_id: int
     stats: CoinCollectionStats
     recent_collections: list[CoinCollectionResponse]
+
+class CoinCollectBatchItem(BaseModel):
+    coin_id: int
+    collected_at: Optional[datetime] = None  # pickup time for offline collects; defaults to now
+
+class CoinCollectBatchRequest(BaseModel):
+    items: list[CoinCollectBatchItem] = Field(..., min_length=1, max_length=500)
+
+class CoinCollectOutcome(str, Enum):
+    collected = "collected"
+    already_collected = "already_collected"
+    not_found = "not_found"  # missing, inactive or deleted coin
+
+class CoinCollectBatchResult(BaseModel):
+    coin_id: int
+    outcome: CoinCollectOutcome
+    collection: Optional[CoinCollectionResponse] = None
+
+class CoinCollectBatchResponse(BaseModel):
+    collected: int
+    results: list[CoinCollectBatchResult]
+
+class LeaderboardEntry(BaseModel):
+    rank: int  # tied users share a rank
+    user_id: int
+    username: str
+    unique_coins: int
+
+class Leaderboard(BaseModel):
+    entries: list[LeaderboardEntry]
+    me: Optional[LeaderboardEntry] = None  # None until the user has collected a coin
+    players: int
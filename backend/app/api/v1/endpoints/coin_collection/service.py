@@ -1,109 +1,173 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, literal, select, true, update
+from sqlalchemy.dialects.postgresql import insert
 
-from app.database.models import UserCoinCollection, Coin, User
-from .schema import CoinCollectionCreate, CoinCollectionResponse, CoinCollectionStats, UserCoinCollectionSummary
+from app.database.models import UserCoinCollection, Coin
+from app.services.collection_stats import bump_collected_coins, get_collection_counters
+from app.services.leaderboard import collector_leaderboard
+from .schema import (
+    CoinCollectionCreate, CoinCollectionResponse, CoinCollectionStats, UserCoinCollectionSummary,
+    CoinCollectBatchRequest, CoinCollectBatchResponse, CoinCollectBatchResult, CoinCollectOutcome,
+    LeaderboardEntry, Leaderboard
+)
 
 class CoinCollectionService:
     @staticmethod
-    def collect_coin(db: Session, user_id: int, coin_data: CoinCollectionCreate) -> CoinCollectionResponse:
-        """Collect a coin for a user"""
-        # Check if coin exists and is active
-        coin = db.query(Coin).filter(
-            Coin.id == coin_data.coin_id,
-            Coin.is_active == True,
-            Coin.is_deleted == False
-        ).first()
-        
-        if not coin:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Coin not found or inactive"
+    async def collect_coin(db: AsyncSession, user_id: int, coin_data: CoinCollectionCreate) -> CoinCollectionResponse:
+        """Collect a coin for a user
+
+        One statement inserts the collection only if the coin is active; the
+        partial unique index on active (user_id, coin_id) turns a duplicate or
+        a racing second collect into a no-op instead of a second row.
+        """
+        stmt = (
+            insert(UserCoinCollection)
+            .from_select(
+                ["user_id", "coin_id", "is_active"],
+                select(literal(user_id), Coin.id, true()).where(
+                    Coin.id == coin_data.coin_id,
+                    Coin.is_active == True,
+                    Coin.is_deleted == False
+                )
             )
-        
-        # Check if user already collected this coin
-        existing_collection = db.query(UserCoinCollection).filter(
-            and_(
-                UserCoinCollection.user_id == user_id,
-                UserCoinCollection.coin_id == coin_data.coin_id,
-                UserCoinCollection.is_active == True
+            .on_conflict_do_nothing(
+                index_elements=[UserCoinCollection.user_id, UserCoinCollection.coin_id],
+                index_where=UserCoinCollection.is_active
             )
-        ).first()
+            .returning(UserCoinCollection)
+        )
+        new_collection = (await db.execute(stmt)).scalars().first()
         
-        if existing_collection:
+        if new_collection is None:
+            # Nothing inserted: tell a missing coin apart from a repeat collect
+            coin_exists = await db.scalar(select(Coin.id).where(
+                Coin.id == coin_data.coin_id,
+                Coin.is_active == True,
+                Coin.is_deleted == False
+            ))
+            await db.rollback()
+            if coin_exists is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Coin not found or inactive"
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Coin already collected"
             )
         
-        # Create new collection
-        new_collection = UserCoinCollection(
-            user_id=user_id,
-            coin_id=coin_data.coin_id,
-            is_active=True
-        )
-        
-        db.add(new_collection)
-        db.commit()
-        db.refresh(new_collection)
+        collected_coins = await bump_collected_coins(db, user_id, 1)
+        await db.commit()
+        collector_leaderboard.update(user_id, collected_coins)
         
         return CoinCollectionResponse.model_validate(new_collection)
     
     @staticmethod
-    def get_user_collections(db: Session, user_id: int, limit: int = 50) -> List[CoinCollectionResponse]:
-        """Get user's coin collections"""
-        collections = db.query(UserCoinCollection).filter(
-            and_(
-                UserCoinCollection.user_id == user_id,
-                UserCoinCollection.is_active == True
+    async def collect_coins(db: AsyncSession, user_id: int, batch: CoinCollectBatchRequest) -> CoinCollectBatchResponse:
+        """Collect several coins at once, reporting an outcome per coin
+
+        Requested ids are checked against active coins in one query and all
+        new collections are written by one INSERT; coins the user already
+        holds are skipped by the partial unique index. A coin listed twice
+        is reported once, with the earliest pickup time kept.
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        pickups: Dict[int, Optional[datetime]] = {}
+        for item in batch.items:
+            collected_at = item.collected_at
+            if collected_at is not None:
+                if collected_at.tzinfo is not None:
+                    collected_at = collected_at.astimezone(timezone.utc).replace(tzinfo=None)
+                # Clock skew must not date a pickup in the future
+                collected_at = min(collected_at, now)
+            if item.coin_id not in pickups:
+                pickups[item.coin_id] = collected_at
+            elif collected_at is not None:
+                earlier = pickups[item.coin_id]
+                pickups[item.coin_id] = collected_at if earlier is None else min(earlier, collected_at)
+        
+        result = await db.execute(select(Coin.id).where(
+            Coin.id.in_(list(pickups)),
+            Coin.is_active == True,
+            Coin.is_deleted == False
+        ))
+        active_ids = set(result.scalars().all())
+        
+        collections: Dict[int, UserCoinCollection] = {}
+        if active_ids:
+            stmt = (
+                insert(UserCoinCollection)
+                .values([
+                    {
+                        "user_id": user_id,
+                        "coin_id": coin_id,
+                        "is_active": True,
+                        "collected_at": collected_at if collected_at is not None else func.now()
+                    }
+                    for coin_id, collected_at in pickups.items()
+                    if coin_id in active_ids
+                ])
+                .on_conflict_do_nothing(
+                    index_elements=[UserCoinCollection.user_id, UserCoinCollection.coin_id],
+                    index_where=UserCoinCollection.is_active
+                )
+                .returning(UserCoinCollection)
             )
-        ).order_by(UserCoinCollection.collected_at.desc()).limit(limit).all()
+            collections = {collection.coin_id: collection for collection in (await db.execute(stmt)).scalars().all()}
+            if collections:
+                collected_coins = await bump_collected_coins(db, user_id, len(collections))
+                await db.commit()
+                collector_leaderboard.update(user_id, collected_coins)
         
-        return [CoinCollectionResponse.model_validate(collection) for collection in collections]
+        results = []
+        for coin_id in pickups:
+            if coin_id in collections:
+                results.append(CoinCollectBatchResult(
+                    coin_id=coin_id,
+                    outcome=CoinCollectOutcome.collected,
+                    collection=CoinCollectionResponse.model_validate(collections[coin_id])
+                ))
+            else:
+                outcome = CoinCollectOutcome.already_collected if coin_id in active_ids else CoinCollectOutcome.not_found
+                results.append(CoinCollectBatchResult(coin_id=coin_id, outcome=outcome))
+        
+        return CoinCollectBatchResponse(collected=len(collections), results=results)
     
     @staticmethod
-    def get_user_collection_stats(db: Session, user_id: int) -> CoinCollectionStats:
-        """Get user's collection statistics"""
-        # Get total collections
-        total_collected = db.query(UserCoinCollection).filter(
-            and_(
-                UserCoinCollection.user_id == user_id,
-                UserCoinCollection.is_active == True
-            )
-        ).count()
-        
-        # Get unique coins collected
-        unique_coins = db.query(UserCoinCollection.coin_id).filter(
+    async def get_user_collections(db: AsyncSession, user_id: int, limit: int = 50) -> List[CoinCollectionResponse]:
+        """Get user's coin collections"""
+        result = await db.execute(select(UserCoinCollection).where(
             and_(
                 UserCoinCollection.user_id == user_id,
                 UserCoinCollection.is_active == True
             )
-        ).distinct().count()
+        ).order_by(UserCoinCollection.collected_at.desc()).limit(limit))
+        collections = result.scalars().all()
         
-        # Get total available coins
-        total_available = db.query(Coin).filter(
-            and_(
-                Coin.is_active == True,
-                Coin.is_deleted == False
-            )
-        ).count()
+        return [CoinCollectionResponse.model_validate(collection) for collection in collections]
+    
+    @staticmethod
+    async def get_user_collection_stats(db: AsyncSession, user_id: int) -> CoinCollectionStats:
+        """Get user's collection statistics from the maintained counters"""
+        collected_coins, total_available = await get_collection_counters(db, user_id)
         
         # Calculate collection rate
-        collection_rate = (unique_coins / total_available * 100) if total_available > 0 else 0
+        collection_rate = (collected_coins / total_available * 100) if total_available > 0 else 0
         
         return CoinCollectionStats(
-            total_collected=total_collected,
-            unique_coins=unique_coins,
+            total_collected=collected_coins,
+            unique_coins=collected_coins,
             collection_rate=round(collection_rate, 2)
         )
     
     @staticmethod
-    def get_user_collection_summary(db: Session, user_id: int) -> UserCoinCollectionSummary:
+    async def get_user_collection_summary(db: AsyncSession, user_id: int) -> UserCoinCollectionSummary:
         """Get complete user collection summary"""
-        stats = CoinCollectionService.get_user_collection_stats(db, user_id)
-        recent_collections = CoinCollectionService.get_user_collections(db, user_id, 10)
+        stats = await CoinCollectionService.get_user_collection_stats(db, user_id)
+        recent_collections = await CoinCollectionService.get_user_collections(db, user_id, 10)
         
         return UserCoinCollectionSummary(
             user_id=user_id,
@@ -112,34 +176,54 @@ class CoinCollectionService:
         )
     
     @staticmethod
-    def remove_collection(db: Session, user_id: int, collection_id: int) -> bool:
+    async def remove_collection(db: AsyncSession, user_id: int, collection_id: int) -> bool:
         """Remove a coin collection (soft delete)"""
-        collection = db.query(UserCoinCollection).filter(
-            and_(
+        # Conditional UPDATE so a repeated remove can't decrement the counter twice
+        removed = await db.scalar(
+            update(UserCoinCollection)
+            .where(
                 UserCoinCollection.id == collection_id,
                 UserCoinCollection.user_id == user_id,
                 UserCoinCollection.is_active == True
             )
-        ).first()
+            .values(is_active=False)
+            .returning(UserCoinCollection.id)
+        )
         
-        if not collection:
+        if removed is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Collection not found"
             )
         
-        collection.is_active = False
-        db.commit()
+        collected_coins = await bump_collected_coins(db, user_id, -1)
+        await db.commit()
+        collector_leaderboard.update(user_id, collected_coins)
         return True
     
     @staticmethod
-    def get_collected_coin_ids(db: Session, user_id: int) -> List[int]:
+    async def get_collected_coin_ids(db: AsyncSession, user_id: int) -> List[int]:
         """Get list of collected coin IDs for a user"""
-        collections = db.query(UserCoinCollection.coin_id).filter(
+        result = await db.execute(select(UserCoinCollection.coin_id).where(
             and_(
                 UserCoinCollection.user_id == user_id,
                 UserCoinCollection.is_active == True
             )
-        ).all()
+        ))
         
-        return [collection.coin_id for collection in collections]
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def get_leaderboard(db: AsyncSession, user_id: int, limit: int = 20) -> Leaderboard:
+        """Top collectors by unique coins, plus the current user's position"""
+        entries, me = await collector_leaderboard.standings(db, user_id, limit)
+        
+        def to_entry(entry) -> LeaderboardEntry:
+            rank, entry_user_id, username, unique_coins = entry
+            return LeaderboardEntry(rank=rank, user_id=entry_user_id, username=username, unique_coins=unique_coins)
+        
+        return Leaderboard(
+            entries=[to_entry(entry) for entry in entries],
+            me=to_entry(me) if me else None,
+            players=len(collector_leaderboard.board)
+        )
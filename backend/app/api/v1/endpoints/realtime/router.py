@@ -2,7 +2,7 @@ import json
 import logging
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
 from fastapi.security import HTTPBearer
-from app.core.security import decode_token
+from app.core.security import decode_token, ensure_not_revoked
 from .service import realtime_service
 from .schema import RealtimeRequest, RealtimeResponse
 
@@ -17,6 +17,7 @@ async def get_current_user_id(token: str = Depends(security)) -> str:
         user_id = payload.get("sub")
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid token")
+        await ensure_not_revoked(payload)
         return str(user_id)
     except Exception as e:
         logger.error(f"Token verification failed: {e}")
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.core import get_db, get_current_user
-from app.database.models import User
-from .schema import SttCreate, SttUpdate, SttResponse, SttList
+from app.core import get_async_db, get_async_read_db, get_current_user
+from app.core.bulk import iter_bulk_items
+from app.core.counting import CountMode
+from app.core.user_cache import CurrentUser
+from app.services.storage import audio_response
+from .schema import SttCreate, SttUpdate, SttResponse, SttList, SttBulkResult
 from .service import SttService
 
 router = APIRouter(prefix="/stt", tags=["Speech-to-Text"])
@@ -13,26 +16,49 @@ router = APIRouter(prefix="/stt", tags=["Speech-to-Text"])
 @router.post("/", response_model=SttResponse)
 async def create_stt(
     stt_data: SttCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Create a new STT record
     """
-    return SttService.create_stt(db, stt_data, current_user)
+    return await SttService.create_stt(db, stt_data, current_user)
+
+
+@router.post("/bulk", response_model=SttBulkResult)
+async def bulk_create_stts(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Create many STT records in one request
+
+    The body is either a JSON array of {"text", "audio"} objects or an NDJSON
+    stream (Content-Type: application/x-ndjson) with one object per line.
+    Results are reported per item, by position in the upload. Records are
+    committed chunk by chunk; an NDJSON upload that goes over the item or
+    line size limit stops there, and the error entry at that index marks
+    where processing ended.
+    """
+    return await SttService.bulk_create_stts(db, iter_bulk_items(request), current_user)
 
 
 @router.get("/", response_model=SttList)
 async def get_stts(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor; overrides page"),
+    include_total: bool = Query(True, description="Compute the total count"),
+    count_mode: CountMode = Query(CountMode.exact, description="exact (cached) or estimated (planner statistics)"),
+    include_audio: bool = Query(False, description="Embed base64 audio in each record"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get STT records for current user with pagination
     """
-    return SttService.get_stts(db, current_user, page, size)
+    return await SttService.get_stts(db, current_user, page, size, cursor, include_total, count_mode, include_audio)
 
 
 @router.get("/search", response_model=SttList)
@@ -40,48 +66,71 @@ async def search_stts(
     q: str = Query(..., min_length=1, description="Search text"),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor; overrides page"),
+    include_total: bool = Query(True, description="Compute the total count"),
+    count_mode: CountMode = Query(CountMode.exact, description="exact (cached) or estimated (planner statistics)"),
+    include_audio: bool = Query(False, description="Embed base64 audio in each record"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Search STT records by text content
+
+    Whole-word matches come first, ranked by relevance with a highlighted snippet;
+    substring matches follow. Supports quoted phrases, OR and -word.
+    """
+    return await SttService.get_stts_by_text_search(db, current_user, q, page, size, cursor, include_total, count_mode, include_audio)
+
+
+@router.get("/{stt_id}/audio")
+async def get_stt_audio(
+    stt_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Stream the raw audio of a STT record
+
+    Supports single byte ranges (Range/If-Range) and ETag revalidation (If-None-Match).
     """
-    return SttService.get_stts_by_text_search(db, current_user, q, page, size)
+    row = await SttService.get_stt_audio(db, stt_id, current_user)
+    return await audio_response(request, row.audio_sha256, row.audio_mime_type, row.audio)
 
 
 @router.get("/{stt_id}", response_model=SttResponse)
 async def get_stt(
     stt_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get STT record by ID
     """
-    return SttService.get_stt(db, stt_id, current_user)
+    return await SttService.get_stt(db, stt_id, current_user)
 
 
 @router.put("/{stt_id}", response_model=SttResponse)
 async def update_stt(
     stt_id: int,
     stt_data: SttUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Update STT record by ID
     """
-    return SttService.update_stt(db, stt_id, stt_data, current_user)
+    return await SttService.update_stt(db, stt_id, stt_data, current_user)
 
 
 @router.delete("/{stt_id}")
 async def delete_stt(
     stt_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Delete STT record by ID
     """
-    SttService.delete_stt(db, stt_id, current_user)
+    await SttService.delete_stt(db, stt_id, current_user)
     return {"message": "STT record deleted successfully"}
@@ -18,8 +18,13 @@ class SttUpdate(BaseModel):
 class SttResponse(SttBase):
     id: int
     user_id: int
-    audio: str = Field(..., description="Base64 encoded audio data")
+    audio: Optional[str] = Field(None, description="Base64 encoded audio data; omitted from lists unless include_audio=true")
+    audio_size: Optional[int] = None
+    audio_mime_type: Optional[str] = None
+    audio_duration_ms: Optional[int] = None
     created_at: datetime
+    rank: Optional[float] = Field(None, description="Search relevance; only set by search")
+    highlight: Optional[str] = Field(None, description="Matched words wrapped in <mark>; only set by search")
     
     class Config:
         from_attributes = True
@@ -27,7 +32,21 @@ class SttResponse(SttBase):
 
 class SttList(BaseModel):
     stts: List[SttResponse]
-    total: int
+    total: Optional[int] = None  # omitted when include_total=false
+    total_is_estimate: bool = False
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class SttBulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class SttBulkResult(BaseModel):
+    created: int
+    failed: int
+    results: List[SttBulkItemResult]
@@ -1,16 +1,49 @@
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List, Tuple
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, insert, or_, select, tuple_
+from sqlalchemy.orm import defer
+from pydantic import ValidationError
+import asyncio
 import math
 import base64
+import binascii
+import logging
 
-from app.database.models import Stt, User
-from .schema import SttCreate, SttUpdate, SttResponse, SttList
+from app.core.bulk import BulkItem
+from app.core.config import get_settings
+from app.core.counting import CountMode, count_cache, count_rows
+from app.core.pagination import decode_cursor, encode_cursor, next_cursor_for
+from app.core.user_cache import CurrentUser
+from app.database.models import Stt
+from app.services.storage import load_audio, store_audio
+from .schema import SttCreate, SttUpdate, SttResponse, SttList, SttBulkItemResult, SttBulkResult
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Must match the configuration of the search_vector column
+SEARCH_CONFIG = "simple"
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2"
 
 
 class SttService:
     @staticmethod
-    def create_stt(db: Session, stt_data: SttCreate, current_user: User) -> SttResponse:
+    async def _to_response(stt: Stt, include_audio: bool = True) -> SttResponse:
+        audio = await load_audio(stt) if include_audio else None
+        return SttResponse(
+            id=stt.id,
+            user_id=stt.user_id,
+            text=stt.text,
+            audio=base64.b64encode(audio).decode('utf-8') if audio is not None else None,
+            audio_size=stt.audio_size,
+            audio_mime_type=stt.audio_mime_type,
+            audio_duration_ms=stt.audio_duration_ms,
+            created_at=stt.created_at
+        )
+    
+    @staticmethod
+    async def create_stt(db: AsyncSession, stt_data: SttCreate, current_user: CurrentUser) -> SttResponse:
         """Create a new STT record"""
         try:
             audio_bytes = base64.b64decode(stt_data.audio)
@@ -23,25 +56,97 @@ class SttService:
         new_stt = Stt(
             user_id=current_user.id,
             text=stt_data.text,
-            audio=audio_bytes
+            **(await store_audio(audio_bytes))
         )
         
         db.add(new_stt)
-        db.commit()
-        db.refresh(new_stt)
-        
-        response_stt = SttResponse.from_orm(new_stt)
-        response_stt.audio = base64.b64encode(new_stt.audio).decode('utf-8')
+        await db.commit()
+        count_cache.invalidate("stts", scope=current_user.id)
+        await db.refresh(new_stt)
         
-        return response_stt
+        return await SttService._to_response(new_stt)
+    
+    @staticmethod
+    async def bulk_create_stts(
+        db: AsyncSession,
+        items: AsyncIterator[BulkItem],
+        current_user: CurrentUser
+    ) -> SttBulkResult:
+        """Create many STT records, reporting success or failure per item.
+
+        Items are decoded as they arrive and inserted in chunks of
+        BULK_INGEST_CHUNK_SIZE, each chunk a single multi-row INSERT and
+        commit. An item that fails validation does not affect the others.
+        """
+        results: List[SttBulkItemResult] = []
+        pending: List[Tuple[int, str, bytes]] = []
+
+        async def flush():
+            stored = await asyncio.gather(
+                *(store_audio(audio) for _, _, audio in pending),
+                return_exceptions=True
+            )
+            batch = []
+            for entry, columns in zip(pending, stored):
+                if isinstance(columns, Exception):
+                    logger.error(f"Bulk STT audio write for item {entry[0]} failed: {columns}")
+                    results.append(SttBulkItemResult(index=entry[0], error="Audio storage failed"))
+                else:
+                    batch.append((entry, columns))
+            pending.clear()
+            if not batch:
+                return
+            rows = [
+                {"user_id": current_user.id, "text": text, **columns}
+                for (_, text, _), columns in batch
+            ]
+            try:
+                result = await db.execute(
+                    insert(Stt).returning(Stt.id, sort_by_parameter_order=True),
+                    rows
+                )
+                ids = result.scalars().all()
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Bulk STT insert of {len(rows)} rows failed: {e}")
+                results.extend(SttBulkItemResult(index=index, error="Insert failed") for (index, _, _), _ in batch)
+            else:
+                results.extend(SttBulkItemResult(index=index, id=stt_id) for ((index, _, _), _), stt_id in zip(batch, ids))
+
+        async for index, item, error in items:
+            if error is None and not isinstance(item, dict):
+                error = "Expected a JSON object"
+            if error is None:
+                try:
+                    stt_data = SttCreate(**item)
+                    audio_bytes = base64.b64decode(stt_data.audio, validate=True)
+                except ValidationError as e:
+                    error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                except (binascii.Error, ValueError):
+                    error = "Invalid base64 audio data"
+                else:
+                    pending.append((index, stt_data.text, audio_bytes))
+            if error is not None:
+                results.append(SttBulkItemResult(index=index, error=error))
+            if len(pending) >= settings.BULK_INGEST_CHUNK_SIZE:
+                await flush()
+        if pending:
+            await flush()
+        count_cache.invalidate("stts", scope=current_user.id)
+
+        results.sort(key=lambda r: r.index)
+        created = sum(1 for r in results if r.id is not None)
+        return SttBulkResult(created=created, failed=len(results) - created, results=results)
     
     @staticmethod
-    def get_stt(db: Session, stt_id: int, current_user: User) -> SttResponse:
+    async def get_stt(db: AsyncSession, stt_id: int, current_user: CurrentUser) -> SttResponse:
         """Get STT record by ID"""
-        stt = db.query(Stt).filter(
+        result = await db.execute(select(Stt).where(
             Stt.id == stt_id,
             Stt.user_id == current_user.id
-        ).first()
+        ))
+        stt = result.scalars().first()
         
         if not stt:
             raise HTTPException(
@@ -49,49 +154,52 @@ class SttService:
                 detail="STT record not found"
             )
         
-        response_stt = SttResponse.from_orm(stt)
-        response_stt.audio = base64.b64encode(stt.audio).decode('utf-8')
+        return await SttService._to_response(stt)
+    
+    @staticmethod
+    async def get_stt_audio(db: AsyncSession, stt_id: int, current_user: CurrentUser):
+        """Get the audio location of one STT record: ``(audio_sha256, audio_mime_type, audio)``
+
+        ``audio`` is only set for rows not yet moved to the blob store.
+        """
+        result = await db.execute(select(Stt.audio_sha256, Stt.audio_mime_type, Stt.audio).where(
+            Stt.id == stt_id,
+            Stt.user_id == current_user.id
+        ))
+        row = result.first()
         
-        return response_stt
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="STT record not found"
+            )
+        
+        return row
     
     @staticmethod
-    def get_stts(
-        db: Session, 
-        current_user: User,
+    async def get_stts(
+        db: AsyncSession, 
+        current_user: CurrentUser,
         page: int = 1, 
-        size: int = 10
+        size: int = 10,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        count_mode: CountMode = CountMode.exact,
+        include_audio: bool = False
     ) -> SttList:
         """Get STT records for current user with pagination"""
-        query = db.query(Stt).filter(Stt.user_id == current_user.id)
-        
-        total = query.count()
-
-        offset = (page - 1) * size
-        stts = query.order_by(Stt.created_at.desc()).offset(offset).limit(size).all()
+        query = select(Stt).where(Stt.user_id == current_user.id)
         
-        pages = math.ceil(total / size) if total > 0 else 1
-        
-        stt_responses = []
-        for stt in stts:
-            response_stt = SttResponse.from_orm(stt)
-            response_stt.audio = base64.b64encode(stt.audio).decode('utf-8')
-            stt_responses.append(response_stt)
-        
-        return SttList(
-            stts=stt_responses,
-            total=total,
-            page=page,
-            size=size,
-            pages=pages
-        )
+        return await SttService._paginate(db, query, current_user, page, size, cursor, include_total, count_mode, include_audio)
     
     @staticmethod
-    def update_stt(db: Session, stt_id: int, stt_data: SttUpdate, current_user: User) -> SttResponse:
+    async def update_stt(db: AsyncSession, stt_id: int, stt_data: SttUpdate, current_user: CurrentUser) -> SttResponse:
         """Update STT record by ID"""
-        stt = db.query(Stt).filter(
+        result = await db.execute(select(Stt).where(
             Stt.id == stt_id,
             Stt.user_id == current_user.id
-        ).first()
+        ))
+        stt = result.scalars().first()
         
         if not stt:
             raise HTTPException(
@@ -103,21 +211,20 @@ class SttService:
         for field, value in update_data.items():
             setattr(stt, field, value)
         
-        db.commit()
-        db.refresh(stt)
-        
-        response_stt = SttResponse.from_orm(stt)
-        response_stt.audio = base64.b64encode(stt.audio).decode('utf-8')
+        await db.commit()
+        count_cache.invalidate("stts", scope=current_user.id)
+        await db.refresh(stt)
         
-        return response_stt
+        return await SttService._to_response(stt)
     
     @staticmethod
-    def delete_stt(db: Session, stt_id: int, current_user: User) -> bool:
+    async def delete_stt(db: AsyncSession, stt_id: int, current_user: CurrentUser) -> bool:
         """Delete STT record by ID"""
-        stt = db.query(Stt).filter(
+        result = await db.execute(select(Stt).where(
             Stt.id == stt_id,
             Stt.user_id == current_user.id
-        ).first()
+        ))
+        stt = result.scalars().first()
         
         if not stt:
             raise HTTPException(
@@ -125,41 +232,117 @@ class SttService:
                 detail="STT record not found"
             )
         
-        db.delete(stt)
-        db.commit()
+        await db.delete(stt)
+        await db.commit()
+        count_cache.invalidate("stts", scope=current_user.id)
         return True
     
     @staticmethod
-    def get_stts_by_text_search(
-        db: Session,
-        current_user: User,
+    async def get_stts_by_text_search(
+        db: AsyncSession,
+        current_user: CurrentUser,
         search_text: str,
         page: int = 1,
-        size: int = 10
+        size: int = 10,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        count_mode: CountMode = CountMode.exact,
+        include_audio: bool = False
     ) -> SttList:
-        """Search STT records by text content"""
-        query = db.query(Stt).filter(
+        """Search STT records by text content, best matches first
+
+        Matches whole words through the full-text index and substrings through
+        the trigram index. Full-text hits are ranked by ts_rank_cd and carry a
+        highlighted snippet; substring-only hits follow, newest first.
+        """
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, search_text)
+        query = select(Stt).where(
             Stt.user_id == current_user.id,
-            Stt.text.ilike(f"%{search_text}%")
+            or_(
+                Stt.search_vector.op("@@")(ts_query),
+                Stt.text.icontains(search_text, autoescape=True)
+            )
         )
+        rank = func.ts_rank_cd(Stt.search_vector, ts_query)
+        highlight = func.ts_headline(SEARCH_CONFIG, Stt.text, ts_query, HEADLINE_OPTIONS)
+        
+        return await SttService._paginate(
+            db, query, current_user, page, size, cursor, include_total, count_mode, include_audio,
+            rank=rank, highlight=highlight
+        )
+    
+    @staticmethod
+    async def _paginate(
+        db: AsyncSession,
+        query,
+        current_user: CurrentUser,
+        page: int,
+        size: int,
+        cursor: Optional[str],
+        include_total: bool,
+        count_mode: CountMode,
+        include_audio: bool,
+        rank=None,
+        highlight=None
+    ) -> SttList:
+        """Newest-first page of ``query``, by OFFSET or by keyset on (created_at, id).
 
-        total = query.count()
-
-        offset = (page - 1) * size
-        stts = query.order_by(Stt.created_at.desc()).offset(offset).limit(size).all()
+        With a ``rank`` expression, rows are ordered by rank first and the
+        keyset includes it; ``highlight`` fills each record's snippet.
+        The audio column is not loaded unless ``include_audio`` is set.
+        """
+        total = None
+        total_is_estimate = False
+        if include_total:
+            total, total_is_estimate = await count_rows(
+                db, query, "stts", scope=current_user.id, mode=count_mode
+            )
+        
+        if rank is None:
+            query = query.order_by(Stt.created_at.desc(), Stt.id.desc())
+            if cursor:
+                after = decode_cursor(cursor, "created_at", "id")
+                query = query.where(tuple_(Stt.created_at, Stt.id) < (after["created_at"], after["id"]))
+        else:
+            query = query.add_columns(rank.label("rank"), highlight.label("highlight"))
+            query = query.order_by(rank.desc(), Stt.created_at.desc(), Stt.id.desc())
+            if cursor:
+                after = decode_cursor(cursor, "rank", "created_at", "id")
+                query = query.where(
+                    tuple_(rank, Stt.created_at, Stt.id) < (float(after["rank"]), after["created_at"], after["id"])
+                )
+        if not cursor:
+            query = query.offset((page - 1) * size)
+        if not include_audio:
+            query = query.options(defer(Stt.audio, raiseload=True))
+        result = await db.execute(query.limit(size + 1))
         
-        pages = math.ceil(total / size) if total > 0 else 1
+        if rank is None:
+            stts = result.scalars().all()
+            next_cursor = next_cursor_for(stts, size, "created_at", "id")
+            items = await asyncio.gather(*(SttService._to_response(stt, include_audio) for stt in stts[:size]))
+        else:
+            rows = result.all()
+            next_cursor = None
+            if len(rows) > size:
+                last = rows[size - 1]
+                next_cursor = encode_cursor({"rank": last.rank, "created_at": last.Stt.created_at, "id": last.Stt.id})
+            items = await asyncio.gather(*(SttService._to_response(row.Stt, include_audio) for row in rows[:size]))
+            for item, row in zip(items, rows):
+                item.rank = row.rank
+                # ts_headline returns the text unchanged when nothing matched as a word
+                item.highlight = row.highlight if row.rank else None
         
-        stt_responses = []
-        for stt in stts:
-            response_stt = SttResponse.from_orm(stt)
-            response_stt.audio = base64.b64encode(stt.audio).decode('utf-8')
-            stt_responses.append(response_stt)
+        pages = None
+        if total is not None:
+            pages = math.ceil(total / size) if total > 0 else 1
         
         return SttList(
-            stts=stt_responses,
+            stts=items,
             total=total,
+            total_is_estimate=total_is_estimate,
             page=page,
             size=size,
-            pages=pages
+            pages=pages,
+            next_cursor=next_cursor
         )
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.core import get_db, get_current_user
-from app.database.models import User
-from .schema import TtsCreate, TtsUpdate, TtsResponse, TtsList
+from app.core import get_async_db, get_async_read_db, get_current_user
+from app.core.bulk import iter_bulk_items
+from app.core.counting import CountMode
+from app.core.user_cache import CurrentUser
+from app.services.storage import audio_response
+from .schema import TtsCreate, TtsUpdate, TtsResponse, TtsList, TtsBulkResult
 from .service import TtsService
 
 router = APIRouter(prefix="/tts", tags=["Text-to-Speech"])
@@ -13,26 +16,49 @@ router = APIRouter(prefix="/tts", tags=["Text-to-Speech"])
 @router.post("/", response_model=TtsResponse)
 async def create_tts(
     tts_data: TtsCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Create a new TTS record
     """
-    return TtsService.create_tts(db, tts_data, current_user)
+    return await TtsService.create_tts(db, tts_data, current_user)
+
+
+@router.post("/bulk", response_model=TtsBulkResult)
+async def bulk_create_ttss(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Create many TTS records in one request
+
+    The body is either a JSON array of {"text", "audio"} objects or an NDJSON
+    stream (Content-Type: application/x-ndjson) with one object per line.
+    Results are reported per item, by position in the upload. Records are
+    committed chunk by chunk; an NDJSON upload that goes over the item or
+    line size limit stops there, and the error entry at that index marks
+    where processing ended.
+    """
+    return await TtsService.bulk_create_ttss(db, iter_bulk_items(request), current_user)
 
 
 @router.get("/", response_model=TtsList)
 async def get_ttss(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor; overrides page"),
+    include_total: bool = Query(True, description="Compute the total count"),
+    count_mode: CountMode = Query(CountMode.exact, description="exact (cached) or estimated (planner statistics)"),
+    include_audio: bool = Query(False, description="Embed base64 audio in each record"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get TTS records for current user with pagination
     """
-    return TtsService.get_ttss(db, current_user, page, size)
+    return await TtsService.get_ttss(db, current_user, page, size, cursor, include_total, count_mode, include_audio)
 
 
 @router.get("/search", response_model=TtsList)
@@ -40,48 +66,71 @@ async def search_ttss(
     q: str = Query(..., min_length=1, description="Search text"),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor; overrides page"),
+    include_total: bool = Query(True, description="Compute the total count"),
+    count_mode: CountMode = Query(CountMode.exact, description="exact (cached) or estimated (planner statistics)"),
+    include_audio: bool = Query(False, description="Embed base64 audio in each record"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Search TTS records by text content
+
+    Whole-word matches come first, ranked by relevance with a highlighted snippet;
+    substring matches follow. Supports quoted phrases, OR and -word.
+    """
+    return await TtsService.get_ttss_by_text_search(db, current_user, q, page, size, cursor, include_total, count_mode, include_audio)
+
+
+@router.get("/{tts_id}/audio")
+async def get_tts_audio(
+    tts_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Stream the raw audio of a TTS record
+
+    Supports single byte ranges (Range/If-Range) and ETag revalidation (If-None-Match).
     """
-    return TtsService.get_ttss_by_text_search(db, current_user, q, page, size)
+    row = await TtsService.get_tts_audio(db, tts_id, current_user)
+    return await audio_response(request, row.audio_sha256, row.audio_mime_type, row.audio)
 
 
 @router.get("/{tts_id}", response_model=TtsResponse)
 async def get_tts(
     tts_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get TTS record by ID
     """
-    return TtsService.get_tts(db, tts_id, current_user)
+    return await TtsService.get_tts(db, tts_id, current_user)
 
 
 @router.put("/{tts_id}", response_model=TtsResponse)
 async def update_tts(
     tts_id: int,
     tts_data: TtsUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Update TTS record by ID
     """
-    return TtsService.update_tts(db, tts_id, tts_data, current_user)
+    return await TtsService.update_tts(db, tts_id, tts_data, current_user)
 
 
 @router.delete("/{tts_id}")
 async def delete_tts(
     tts_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Delete TTS record by ID
     """
-    TtsService.delete_tts(db, tts_id, current_user)
+    await TtsService.delete_tts(db, tts_id, current_user)
     return {"message": "TTS record deleted successfully"}
@@ -1,16 +1,49 @@
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List, Tuple
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, insert, or_, select, tuple_
+from sqlalchemy.orm import defer
+from pydantic import ValidationError
+import asyncio
 import math
 import base64
+import binascii
+import logging
 
-from app.database.models import Tts, User
-from .schema import TtsCreate, TtsUpdate, TtsResponse, TtsList
+from app.core.bulk import BulkItem
+from app.core.config import get_settings
+from app.core.counting import CountMode, count_cache, count_rows
+from app.core.pagination import decode_cursor, encode_cursor, next_cursor_for
+from app.core.user_cache import CurrentUser
+from app.database.models import Tts
+from app.services.storage import load_audio, store_audio
+from .schema import TtsCreate, TtsUpdate, TtsResponse, TtsList, TtsBulkItemResult, TtsBulkResult
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Must match the configuration of the search_vector column
+SEARCH_CONFIG = "simple"
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2"
 
 
 class TtsService:
     @staticmethod
-    def create_tts(db: Session, tts_data: TtsCreate, current_user: User) -> TtsResponse:
+    async def _to_response(tts: Tts, include_audio: bool = True) -> TtsResponse:
+        audio = await load_audio(tts) if include_audio else None
+        return TtsResponse(
+            id=tts.id,
+            user_id=tts.user_id,
+            text=tts.text,
+            audio=base64.b64encode(audio).decode('utf-8') if audio is not None else None,
+            audio_size=tts.audio_size,
+            audio_mime_type=tts.audio_mime_type,
+            audio_duration_ms=tts.audio_duration_ms,
+            created_at=tts.created_at
+        )
+    
+    @staticmethod
+    async def create_tts(db: AsyncSession, tts_data: TtsCreate, current_user: CurrentUser) -> TtsResponse:
         """Create a new TTS record"""
         try:
             audio_bytes = base64.b64decode(tts_data.audio)
@@ -23,25 +56,97 @@ class TtsService:
         new_tts = Tts(
             user_id=current_user.id,
             text=tts_data.text,
-            audio=audio_bytes
+            **(await store_audio(audio_bytes))
         )
         
         db.add(new_tts)
-        db.commit()
-        db.refresh(new_tts)
-        
-        response_tts = TtsResponse.from_orm(new_tts)
-        response_tts.audio = base64.b64encode(new_tts.audio).decode('utf-8')
+        await db.commit()
+        count_cache.invalidate("ttss", scope=current_user.id)
+        await db.refresh(new_tts)
         
-        return response_tts
+        return await TtsService._to_response(new_tts)
     
     @staticmethod
-    def get_tts(db: Session, tts_id: int, current_user: User) -> TtsResponse:
+    async def bulk_create_ttss(
+        db: AsyncSession,
+        items: AsyncIterator[BulkItem],
+        current_user: CurrentUser
+    ) -> TtsBulkResult:
+        """Create many TTS records, reporting success or failure per item.
+
+        Items are decoded as they arrive and inserted in chunks of
+        BULK_INGEST_CHUNK_SIZE, each chunk a single multi-row INSERT and
+        commit. An item that fails validation does not affect the others.
+        """
+        results: List[TtsBulkItemResult] = []
+        pending: List[Tuple[int, str, bytes]] = []
+
+        async def flush():
+            stored = await asyncio.gather(
+                *(store_audio(audio) for _, _, audio in pending),
+                return_exceptions=True
+            )
+            batch = []
+            for entry, columns in zip(pending, stored):
+                if isinstance(columns, Exception):
+                    logger.error(f"Bulk TTS audio write for item {entry[0]} failed: {columns}")
+                    results.append(TtsBulkItemResult(index=entry[0], error="Audio storage failed"))
+                else:
+                    batch.append((entry, columns))
+            pending.clear()
+            if not batch:
+                return
+            rows = [
+                {"user_id": current_user.id, "text": text, **columns}
+                for (_, text, _), columns in batch
+            ]
+            try:
+                result = await db.execute(
+                    insert(Tts).returning(Tts.id, sort_by_parameter_order=True),
+                    rows
+                )
+                ids = result.scalars().all()
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Bulk TTS insert of {len(rows)} rows failed: {e}")
+                results.extend(TtsBulkItemResult(index=index, error="Insert failed") for (index, _, _), _ in batch)
+            else:
+                results.extend(TtsBulkItemResult(index=index, id=tts_id) for ((index, _, _), _), tts_id in zip(batch, ids))
+
+        async for index, item, error in items:
+            if error is None and not isinstance(item, dict):
+                error = "Expected a JSON object"
+            if error is None:
+                try:
+                    tts_data = TtsCreate(**item)
+                    audio_bytes = base64.b64decode(tts_data.audio, validate=True)
+                except ValidationError as e:
+                    error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                except (binascii.Error, ValueError):
+                    error = "Invalid base64 audio data"
+                else:
+                    pending.append((index, tts_data.text, audio_bytes))
+            if error is not None:
+                results.append(TtsBulkItemResult(index=index, error=error))
+            if len(pending) >= settings.BULK_INGEST_CHUNK_SIZE:
+                await flush()
+        if pending:
+            await flush()
+        count_cache.invalidate("ttss", scope=current_user.id)
+
+        results.sort(key=lambda r: r.index)
+        created = sum(1 for r in results if r.id is not None)
+        return TtsBulkResult(created=created, failed=len(results) - created, results=results)
+    
+    @staticmethod
+    async def get_tts(db: AsyncSession, tts_id: int, current_user: CurrentUser) -> TtsResponse:
         """Get TTS record by ID"""
-        tts = db.query(Tts).filter(
+        result = await db.execute(select(Tts).where(
             Tts.id == tts_id,
             Tts.user_id == current_user.id
-        ).first()
+        ))
+        tts = result.scalars().first()
         
         if not tts:
             raise HTTPException(
@@ -49,49 +154,52 @@ class TtsService:
                 detail="TTS record not found"
             )
         
-        response_tts = TtsResponse.from_orm(tts)
-        response_tts.audio = base64.b64encode(tts.audio).decode('utf-8')
+        return await TtsService._to_response(tts)
+    
+    @staticmethod
+    async def get_tts_audio(db: AsyncSession, tts_id: int, current_user: CurrentUser):
+        """Get the audio location of one TTS record: ``(audio_sha256, audio_mime_type, audio)``
+
+        ``audio`` is only set for rows not yet moved to the blob store.
+        """
+        result = await db.execute(select(Tts.audio_sha256, Tts.audio_mime_type, Tts.audio).where(
+            Tts.id == tts_id,
+            Tts.user_id == current_user.id
+        ))
+        row = result.first()
+        
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="TTS record not found"
+            )
         
-        return response_tts
+        return row
     
     @staticmethod
-    def get_ttss(
-        db: Session, 
-        current_user: User,
+    async def get_ttss(
+        db: AsyncSession, 
+        current_user: CurrentUser,
         page: int = 1, 
-        size: int = 10
+        size: int = 10,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        count_mode: CountMode = CountMode.exact,
+        include_audio: bool = False
     ) -> TtsList:
         """Get TTS records for current user with pagination"""
-        query = db.query(Tts).filter(Tts.user_id == current_user.id)
-        
-        total = query.count()
-
-        offset = (page - 1) * size
-        ttss = query.order_by(Tts.created_at.desc()).offset(offset).limit(size).all()
-        
-        pages = math.ceil(total / size) if total > 0 else 1
-        
-        tts_responses = []
-        for tts in ttss:
-            response_tts = TtsResponse.from_orm(tts)
-            response_tts.audio = base64.b64encode(tts.audio).decode('utf-8')
-            tts_responses.append(response_tts)
+        query = select(Tts).where(Tts.user_id == current_user.id)
         
-        return TtsList(
-            ttss=tts_responses,
-            total=total,
-            page=page,
-            size=size,
-            pages=pages
-        )
+        return await TtsService._paginate(db, query, current_user, page, size, cursor, include_total, count_mode, include_audio)
     
     @staticmethod
-    def update_tts(db: Session, tts_id: int, tts_data: TtsUpdate, current_user: User) -> TtsResponse:
+    async def update_tts(db: AsyncSession, tts_id: int, tts_data: TtsUpdate, current_user: CurrentUser) -> TtsResponse:
         """Update TTS record by ID"""
-        tts = db.query(Tts).filter(
+        result = await db.execute(select(Tts).where(
             Tts.id == tts_id,
             Tts.user_id == current_user.id
-        ).first()
+        ))
+        tts = result.scalars().first()
         
         if not tts:
             raise HTTPException(
@@ -103,21 +211,20 @@ class TtsService:
         for field, value in update_data.items():
             setattr(tts, field, value)
         
-        db.commit()
-        db.refresh(tts)
+        await db.commit()
+        count_cache.invalidate("ttss", scope=current_user.id)
+        await db.refresh(tts)
         
-        response_tts = TtsResponse.from_orm(tts)
-        response_tts.audio = base64.b64encode(tts.audio).decode('utf-8')
-        
-        return response_tts
+        return await TtsService._to_response(tts)
     
     @staticmethod
-    def delete_tts(db: Session, tts_id: int, current_user: User) -> bool:
+    async def delete_tts(db: AsyncSession, tts_id: int, current_user: CurrentUser) -> bool:
         """Delete TTS record by ID"""
-        tts = db.query(Tts).filter(
+        result = await db.execute(select(Tts).where(
             Tts.id == tts_id,
             Tts.user_id == current_user.id
-        ).first()
+        ))
+        tts = result.scalars().first()
         
         if not tts:
             raise HTTPException(
@@ -125,41 +232,117 @@ class TtsService:
                 detail="TTS record not found"
             )
         
-        db.delete(tts)
-        db.commit()
+        await db.delete(tts)
+        await db.commit()
+        count_cache.invalidate("ttss", scope=current_user.id)
         return True
     
     @staticmethod
-    def get_ttss_by_text_search(
-        db: Session,
-        current_user: User,
+    async def get_ttss_by_text_search(
+        db: AsyncSession,
+        current_user: CurrentUser,
         search_text: str,
         page: int = 1,
-        size: int = 10
+        size: int = 10,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        count_mode: CountMode = CountMode.exact,
+        include_audio: bool = False
     ) -> TtsList:
-        """Search TTS records by text content"""
-        query = db.query(Tts).filter(
+        """Search TTS records by text content, best matches first
+
+        Matches whole words through the full-text index and substrings through
+        the trigram index. Full-text hits are ranked by ts_rank_cd and carry a
+        highlighted snippet; substring-only hits follow, newest first.
+        """
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, search_text)
+        query = select(Tts).where(
             Tts.user_id == current_user.id,
-            Tts.text.ilike(f"%{search_text}%")
+            or_(
+                Tts.search_vector.op("@@")(ts_query),
+                Tts.text.icontains(search_text, autoescape=True)
+            )
         )
+        rank = func.ts_rank_cd(Tts.search_vector, ts_query)
+        highlight = func.ts_headline(SEARCH_CONFIG, Tts.text, ts_query, HEADLINE_OPTIONS)
         
-        total = query.count()
+        return await TtsService._paginate(
+            db, query, current_user, page, size, cursor, include_total, count_mode, include_audio,
+            rank=rank, highlight=highlight
+        )
+    
+    @staticmethod
+    async def _paginate(
+        db: AsyncSession,
+        query,
+        current_user: CurrentUser,
+        page: int,
+        size: int,
+        cursor: Optional[str],
+        include_total: bool,
+        count_mode: CountMode,
+        include_audio: bool,
+        rank=None,
+        highlight=None
+    ) -> TtsList:
+        """Newest-first page of ``query``, by OFFSET or by keyset on (created_at, id).
+
+        With a ``rank`` expression, rows are ordered by rank first and the
+        keyset includes it; ``highlight`` fills each record's snippet.
+        The audio column is not loaded unless ``include_audio`` is set.
+        """
+        total = None
+        total_is_estimate = False
+        if include_total:
+            total, total_is_estimate = await count_rows(
+                db, query, "ttss", scope=current_user.id, mode=count_mode
+            )
         
-        offset = (page - 1) * size
-        ttss = query.order_by(Tts.created_at.desc()).offset(offset).limit(size).all()
+        if rank is None:
+            query = query.order_by(Tts.created_at.desc(), Tts.id.desc())
+            if cursor:
+                after = decode_cursor(cursor, "created_at", "id")
+                query = query.where(tuple_(Tts.created_at, Tts.id) < (after["created_at"], after["id"]))
+        else:
+            query = query.add_columns(rank.label("rank"), highlight.label("highlight"))
+            query = query.order_by(rank.desc(), Tts.created_at.desc(), Tts.id.desc())
+            if cursor:
+                after = decode_cursor(cursor, "rank", "created_at", "id")
+                query = query.where(
+                    tuple_(rank, Tts.created_at, Tts.id) < (float(after["rank"]), after["created_at"], after["id"])
+                )
+        if not cursor:
+            query = query.offset((page - 1) * size)
+        if not include_audio:
+            query = query.options(defer(Tts.audio, raiseload=True))
+        result = await db.execute(query.limit(size + 1))
         
-        pages = math.ceil(total / size) if total > 0 else 1
+        if rank is None:
+            ttss = result.scalars().all()
+            next_cursor = next_cursor_for(ttss, size, "created_at", "id")
+            items = await asyncio.gather(*(TtsService._to_response(tts, include_audio) for tts in ttss[:size]))
+        else:
+            rows = result.all()
+            next_cursor = None
+            if len(rows) > size:
+                last = rows[size - 1]
+                next_cursor = encode_cursor({"rank": last.rank, "created_at": last.Tts.created_at, "id": last.Tts.id})
+            items = await asyncio.gather(*(TtsService._to_response(row.Tts, include_audio) for row in rows[:size]))
+            for item, row in zip(items, rows):
+                item.rank = row.rank
+                # ts_headline returns the text unchanged when nothing matched as a word
+                item.highlight = row.highlight if row.rank else None
         
-        tts_responses = []
-        for tts in ttss:
-            response_tts = TtsResponse.from_orm(tts)
-            response_tts.audio = base64.b64encode(tts.audio).decode('utf-8')
-            tts_responses.append(response_tts)
+        pages = None
+        if total is not None:
+            pages = math.ceil(total / size) if total > 0 else 1
         
         return TtsList(
-            ttss=tts_responses,
+            ttss=items,
             total=total,
+            total_is_estimate=total_is_estimate,
             page=page,
             size=size,
-            pages=pages
-        )
\ No newline at end of file
+            pages=pages,
+            next_cursor=next_cursor
+        )
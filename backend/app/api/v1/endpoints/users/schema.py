@@ -37,7 +37,9 @@ class PasswordChange(BaseModel):
 
 class UserList(BaseModel):
     users: List[UserResponse]
-    total: int
+    total: Optional[int] = None  # omitted when include_total=false
+    total_is_estimate: bool = False
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
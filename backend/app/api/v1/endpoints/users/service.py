@@ -1,26 +1,43 @@
-from typing import Optional, List
+from typing import Optional
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 import math
 
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, verify_password_async
+from app.core.counting import CountMode, count_cache, count_rows
+from app.core.pagination import decode_cursor, next_cursor_for
+from app.core.user_cache import CurrentUser, user_cache
 from app.database.models import User
+from app.services.leaderboard import collector_leaderboard
 from .schema import UserCreate, UserUpdate, UserResponse, UserList, PasswordChange
 
 
 class UserService:
     @staticmethod
-    def create_user(db: Session, user_data: UserCreate) -> UserResponse:
+    async def _get_own_row(db: AsyncSession, current_user: CurrentUser) -> User:
+        """Session-bound row for the caller; ``current_user`` is a read-only snapshot."""
+        result = await db.execute(select(User).where(User.id == current_user.id))
+        user = result.scalars().first()
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        return user
+
+    @staticmethod
+    async def create_user(db: AsyncSession, user_data: UserCreate) -> UserResponse:
         """Create a new user"""
-        existing_user = db.query(User).filter(User.username == user_data.username).first()
+        result = await db.execute(select(User).where(User.username == user_data.username))
+        existing_user = result.scalars().first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already exists"
             )
         
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         new_user = User(
             username=user_data.username,
             hashed_password=hashed_password,
@@ -31,18 +48,20 @@ class UserService:
         )
         
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        count_cache.invalidate("users")
+        await db.refresh(new_user)
         
         return UserResponse.from_orm(new_user)
     
     @staticmethod
-    def get_user(db: Session, user_id: int) -> UserResponse:
+    async def get_user(db: AsyncSession, user_id: int) -> UserResponse:
         """Get user by ID"""
-        user = db.query(User).filter(
+        result = await db.execute(select(User).where(
             User.id == user_id, 
             User.is_deleted == False
-        ).first()
+        ))
+        user = result.scalars().first()
         
         if not user:
             raise HTTPException(
@@ -53,40 +72,63 @@ class UserService:
         return UserResponse.from_orm(user)
     
     @staticmethod
-    def get_users(
-        db: Session, 
+    async def get_users(
+        db: AsyncSession, 
         page: int = 1, 
         size: int = 10,
-        is_active: Optional[bool] = None
+        is_active: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        count_mode: CountMode = CountMode.exact
     ) -> UserList:
-        """Get users with pagination and filtering"""
-        query = db.query(User).filter(User.is_deleted == False)
+        """Get users with pagination and filtering.
+
+        With ``cursor`` the page is located by keyset on ``id`` instead of OFFSET.
+        """
+        query = select(User).where(User.is_deleted == False)
         
         if is_active is not None:
-            query = query.filter(User.is_active == is_active)
-        
-        total = query.count()
+            query = query.where(User.is_active == is_active)
+        
+        total = None
+        total_is_estimate = False
+        if include_total:
+            total, total_is_estimate = await count_rows(
+                db, query, "users",
+                mode=count_mode
+            )
         
-        offset = (page - 1) * size
-        users = query.offset(offset).limit(size).all()
+        query = query.order_by(User.id)
+        if cursor:
+            query = query.where(User.id > decode_cursor(cursor, "id")["id"])
+        else:
+            query = query.offset((page - 1) * size)
+        result = await db.execute(query.limit(size + 1))
+        users = result.scalars().all()
+        next_cursor = next_cursor_for(users, size, "id")
         
-        pages = math.ceil(total / size) if total > 0 else 1
+        pages = None
+        if total is not None:
+            pages = math.ceil(total / size) if total > 0 else 1
         
         return UserList(
-            users=[UserResponse.from_orm(user) for user in users],
+            users=[UserResponse.from_orm(user) for user in users[:size]],
             total=total,
+            total_is_estimate=total_is_estimate,
             page=page,
             size=size,
-            pages=pages
+            pages=pages,
+            next_cursor=next_cursor
         )
     
     @staticmethod
-    def update_user(db: Session, user_id: int, user_data: UserUpdate) -> UserResponse:
+    async def update_user(db: AsyncSession, user_id: int, user_data: UserUpdate) -> UserResponse:
         """Update user by ID"""
-        user = db.query(User).filter(
+        result = await db.execute(select(User).where(
             User.id == user_id, 
             User.is_deleted == False
-        ).first()
+        ))
+        user = result.scalars().first()
         
         if not user:
             raise HTTPException(
@@ -98,18 +140,23 @@ class UserService:
         for field, value in update_data.items():
             setattr(user, field, value)
         
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        count_cache.invalidate("users")
+        user_cache.invalidate(user_id)
+        if not user.is_active:
+            collector_leaderboard.remove(user_id)
+        await db.refresh(user)
         
         return UserResponse.from_orm(user)
     
     @staticmethod
-    def delete_user(db: Session, user_id: int) -> bool:
+    async def delete_user(db: AsyncSession, user_id: int) -> bool:
         """Soft delete user by ID"""
-        user = db.query(User).filter(
+        result = await db.execute(select(User).where(
             User.id == user_id, 
             User.is_deleted == False
-        ).first()
+        ))
+        user = result.scalars().first()
         
         if not user:
             raise HTTPException(
@@ -120,60 +167,74 @@ class UserService:
         user.is_deleted = True
         user.is_active = False
         
-        db.commit()
+        await db.commit()
+        count_cache.invalidate("users")
+        user_cache.invalidate(user_id)
+        collector_leaderboard.remove(user_id)
         return True
     
     @staticmethod
-    def get_current_user_profile(db: Session, current_user: User) -> UserResponse:
+    async def get_current_user_profile(db: AsyncSession, current_user: CurrentUser) -> UserResponse:
         """Get current user profile"""
         return UserResponse.from_orm(current_user)
     
     @staticmethod
-    def change_password(db: Session, current_user: User, password_data: PasswordChange) -> UserResponse:
+    async def change_password(db: AsyncSession, current_user: CurrentUser, password_data: PasswordChange) -> UserResponse:
         """Change user password"""
+        user = await UserService._get_own_row(db, current_user)
         # Verify current password
-        if not verify_password(password_data.current_password, current_user.hashed_password):
+        if not await verify_password_async(password_data.current_password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
             )
         
         # Update password
-        current_user.hashed_password = get_password_hash(password_data.new_password)
+        user.hashed_password = await get_password_hash_async(password_data.new_password)
         
-        db.commit()
-        db.refresh(current_user)
+        await db.commit()
+        count_cache.invalidate("users")
+        user_cache.invalidate(user.id)
+        await db.refresh(user)
         
-        return UserResponse.from_orm(current_user)
+        return UserResponse.from_orm(user)
     
     @staticmethod
-    def update_current_user(db: Session, current_user: User, user_data: UserUpdate) -> UserResponse:
+    async def update_current_user(db: AsyncSession, current_user: CurrentUser, user_data: UserUpdate) -> UserResponse:
         """Update current user profile"""
+        user = await UserService._get_own_row(db, current_user)
         update_data = user_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             if field != 'is_active':  # Prevent users from changing their own active status
-                setattr(current_user, field, value)
+                setattr(user, field, value)
         
-        db.commit()
-        db.refresh(current_user)
+        await db.commit()
+        count_cache.invalidate("users")
+        user_cache.invalidate(user.id)
+        await db.refresh(user)
         
-        return UserResponse.from_orm(current_user)
+        return UserResponse.from_orm(user)
     
     @staticmethod
-    def deactivate_current_user(db: Session, current_user: User) -> bool:
+    async def deactivate_current_user(db: AsyncSession, current_user: CurrentUser) -> bool:
         """Deactivate current user account"""
-        current_user.is_active = False
+        user = await UserService._get_own_row(db, current_user)
+        user.is_active = False
         
-        db.commit()
+        await db.commit()
+        count_cache.invalidate("users")
+        user_cache.invalidate(user.id)
+        collector_leaderboard.remove(user.id)
         return True
     
     @staticmethod
-    def reactivate_user(db: Session, user_id: int) -> UserResponse:
+    async def reactivate_user(db: AsyncSession, user_id: int) -> UserResponse:
         """Reactivate user account (admin only)"""
-        user = db.query(User).filter(
+        result = await db.execute(select(User).where(
             User.id == user_id, 
             User.is_deleted == False
-        ).first()
+        ))
+        user = result.scalars().first()
         
         if not user:
             raise HTTPException(
@@ -183,7 +244,9 @@ class UserService:
         
         user.is_active = True
         
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        count_cache.invalidate("users")
+        user_cache.invalidate(user_id)
+        await db.refresh(user)
         
         return UserResponse.from_orm(user)
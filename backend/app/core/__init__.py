@@ -1,12 +1,18 @@
 from .config import get_settings
-from .database import get_db, Base
+from .database import get_db, get_async_db, Base
 from .security import (
     get_password_hash,
+    get_password_hash_async,
     verify_password,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     get_current_user,
     decode_token,
     decode_refresh_token,
+    ensure_not_revoked,
+    revoke_token,
     oauth2_scheme,
-) 
\ No newline at end of file
+    optional_oauth2_scheme,
+)
+from .replica import get_async_read_db, replica_router
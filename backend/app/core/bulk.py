@@ -0,0 +1,118 @@
+import json
+from typing import Any, AsyncIterator, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from .config import get_settings
+
+settings = get_settings()
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+
+# (index, item, error): item is None when the entry could not be parsed
+BulkItem = Tuple[int, Optional[Any], Optional[str]]
+
+
+# Errors that end an NDJSON upload; nothing after the reported index is read
+TOO_MANY_ITEMS = f"At most {settings.BULK_INGEST_MAX_ITEMS} items per request; this and later items were not processed"
+LINE_TOO_LONG = "NDJSON line is too long; this and later items were not processed"
+
+
+def _too_many_items() -> HTTPException:
+    return HTTPException(
+        status_code=413,  # Content Too Large
+        detail=f"At most {settings.BULK_INGEST_MAX_ITEMS} items per request"
+    )
+
+
+def _body_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,  # Content Too Large
+        detail=f"JSON array bodies are limited to {settings.BULK_INGEST_MAX_JSON_BYTES} bytes; send larger uploads as NDJSON"
+    )
+
+
+async def _read_json_body(request: Request) -> bytes:
+    """Whole request body, refused with 413 past BULK_INGEST_MAX_JSON_BYTES."""
+    limit = settings.BULK_INGEST_MAX_JSON_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise _body_too_large()
+    body = bytearray()
+    # Counted as it arrives: Content-Length may be missing (chunked) or wrong
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise _body_too_large()
+    return bytes(body)
+
+
+def _parse_line(index: int, line: bytes) -> BulkItem:
+    try:
+        return index, json.loads(line), None
+    except ValueError:
+        return index, None, "Invalid JSON"
+
+
+async def _iter_ndjson(request: Request) -> AsyncIterator[BulkItem]:
+    # Earlier chunks may already be committed by the time a limit is hit, so
+    # limits end the stream with an error entry instead of failing the request
+    buffer = bytearray()
+    index = 0
+    async for chunk in request.stream():
+        # Only the freshly appended bytes can hold a newline not seen yet
+        search_from = len(buffer)
+        buffer += chunk
+        start = 0
+        end = buffer.find(b"\n", search_from)
+        while end != -1:
+            line = bytes(buffer[start:end])
+            start = end + 1
+            end = buffer.find(b"\n", start)
+            if not line.strip():
+                continue
+            if index >= settings.BULK_INGEST_MAX_ITEMS:
+                yield index, None, TOO_MANY_ITEMS
+                return
+            if len(line) > settings.BULK_INGEST_MAX_LINE_BYTES:
+                yield index, None, LINE_TOO_LONG
+                return
+            yield _parse_line(index, line)
+            index += 1
+        del buffer[:start]
+        if len(buffer) > settings.BULK_INGEST_MAX_LINE_BYTES:
+            yield index, None, LINE_TOO_LONG
+            return
+    if buffer.strip():
+        if index >= settings.BULK_INGEST_MAX_ITEMS:
+            yield index, None, TOO_MANY_ITEMS
+            return
+        yield _parse_line(index, bytes(buffer))
+
+
+async def iter_bulk_items(request: Request) -> AsyncIterator[BulkItem]:
+    """Items of a bulk upload, parsed as they arrive.
+
+    NDJSON bodies (one JSON object per line) are consumed incrementally, so
+    only the current line and the caller's pending chunk are held in memory.
+    Going over BULK_INGEST_MAX_ITEMS or BULK_INGEST_MAX_LINE_BYTES yields a
+    final error item for the offending index and stops reading. Any other
+    body must be a JSON array; it is parsed and checked whole, before
+    anything is yielded, and rejected with 413 when it is over
+    BULK_INGEST_MAX_JSON_BYTES or holds too many items.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_CONTENT_TYPES:
+        async for item in _iter_ndjson(request):
+            yield item
+        return
+    try:
+        items = json.loads(await _read_json_body(request))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON body")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a JSON array of items")
+    if len(items) > settings.BULK_INGEST_MAX_ITEMS:
+        raise _too_many_items()
+    for index, item in enumerate(items):
+        yield index, item, None
@@ -18,7 +18,79 @@ class Settings(BaseSettings):
         "*"
     ]
     DATABASE_URL: str = Field(env="DATABASE_URL")
+    # Optional explicit asyncpg URL; derived from DATABASE_URL when empty
+    ASYNC_DATABASE_URL: str = Field("", env="ASYNC_DATABASE_URL")
+
+    # Read replicas: comma-separated URLs; read-only endpoints are routed here
+    DATABASE_REPLICA_URLS: str = Field("", env="DATABASE_REPLICA_URLS")
+    REPLICA_MAX_LAG_SECONDS: float = Field(5.0, env="REPLICA_MAX_LAG_SECONDS")
+    REPLICA_LAG_CHECK_INTERVAL: float = Field(2.0, env="REPLICA_LAG_CHECK_INTERVAL")
+    # After a user writes, their reads stay on the primary for this long
+    READ_YOUR_WRITES_SECONDS: float = Field(5.0, env="READ_YOUR_WRITES_SECONDS")
+
+    # List totals: cached exact counts and planner-estimate mode
+    COUNT_CACHE_TTL_SECONDS: float = Field(30.0, env="COUNT_CACHE_TTL_SECONDS")
+    COUNT_CACHE_MAX_ENTRIES: int = Field(10000, env="COUNT_CACHE_MAX_ENTRIES")
+    # Estimates below this are replaced by an exact count
+    COUNT_ESTIMATE_MIN_ROWS: int = Field(1000, env="COUNT_ESTIMATE_MIN_ROWS")
+
+    # STT/TTS audio blob storage
+    BLOB_STORE_BACKEND: str = Field("local", env="BLOB_STORE_BACKEND")
+    BLOB_STORE_PATH: str = Field("data/blobs", env="BLOB_STORE_PATH")
+
+    # GET /coins/ar snapshot: how often each worker rebuilds it to see other workers' writes
+    AR_CATALOG_REFRESH_SECONDS: float = Field(30.0, env="AR_CATALOG_REFRESH_SECONDS")
+
+    # GET /coins/changes: final-page tokens rewind this far so late-committing writes are not missed
+    COIN_CHANGES_OVERLAP_SECONDS: float = Field(5.0, env="COIN_CHANGES_OVERLAP_SECONDS")
+
+    # GET /coin-collections/leaderboard: how often each worker reloads the ranking
+    LEADERBOARD_REFRESH_SECONDS: float = Field(60.0, env="LEADERBOARD_REFRESH_SECONDS")
+
+    # POST /coin-collections/public write-behind buffer
+    GUEST_BUFFER_MAX_ITEMS: int = Field(10000, env="GUEST_BUFFER_MAX_ITEMS")
+    GUEST_FLUSH_BATCH_SIZE: int = Field(500, env="GUEST_FLUSH_BATCH_SIZE")
+    GUEST_FLUSH_INTERVAL_SECONDS: float = Field(2.0, env="GUEST_FLUSH_INTERVAL_SECONDS")
+
+    # GET /coins/nearby: grid cell size, cross-worker refresh interval, largest radius
+    NEARBY_GRID_CELL_DEGREES: float = Field(0.01, env="NEARBY_GRID_CELL_DEGREES")
+    NEARBY_INDEX_REFRESH_SECONDS: float = Field(60.0, env="NEARBY_INDEX_REFRESH_SECONDS")
+    NEARBY_MAX_RADIUS_M: float = Field(50000.0, env="NEARBY_MAX_RADIUS_M")
+
+    # Bulk STT/TTS ingest: rows per INSERT/commit, items per request, bytes per NDJSON line
+    # and per JSON-array body (which is parsed whole, unlike NDJSON)
+    BULK_INGEST_CHUNK_SIZE: int = Field(200, env="BULK_INGEST_CHUNK_SIZE")
+    BULK_INGEST_MAX_ITEMS: int = Field(10000, env="BULK_INGEST_MAX_ITEMS")
+    BULK_INGEST_MAX_LINE_BYTES: int = Field(32 * 1024 * 1024, env="BULK_INGEST_MAX_LINE_BYTES")
+    BULK_INGEST_MAX_JSON_BYTES: int = Field(64 * 1024 * 1024, env="BULK_INGEST_MAX_JSON_BYTES")
+
+    # Connection pool (applied to every engine)
+    DB_POOL_SIZE: int = Field(10, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(20, env="DB_MAX_OVERFLOW")
+    DB_POOL_PRE_PING: bool = Field(True, env="DB_POOL_PRE_PING")
+    DB_POOL_RECYCLE: int = Field(1800, env="DB_POOL_RECYCLE")  # seconds, -1 disables
+    DB_POOL_TIMEOUT: int = Field(30, env="DB_POOL_TIMEOUT")  # seconds to wait for a free connection
+    # SQL logging: log every Nth statement (0 = off, 1 = everything) and/or
+    # any statement slower than DB_SLOW_QUERY_MS (0 = off)
+    DB_ECHO_SAMPLE_RATE: int = Field(0, env="DB_ECHO_SAMPLE_RATE")
+    DB_SLOW_QUERY_MS: int = Field(0, env="DB_SLOW_QUERY_MS")
     SECRET_KEY: str = Field("", env="SECRET_KEY")
+    # get_current_user: per-worker user snapshot cache (0 disables)
+    USER_CACHE_TTL_SECONDS: float = Field(30.0, env="USER_CACHE_TTL_SECONDS")
+    USER_CACHE_MAX_ENTRIES: int = Field(10000, env="USER_CACHE_MAX_ENTRIES")
+    # decode_token: verified JWT payloads cached until their exp (0 entries disables),
+    # and how long a token that failed verification stays rejected without re-checking
+    JWT_CACHE_MAX_ENTRIES: int = Field(50000, env="JWT_CACHE_MAX_ENTRIES")
+    JWT_CACHE_NEGATIVE_TTL_SECONDS: float = Field(30.0, env="JWT_CACHE_NEGATIVE_TTL_SECONDS")
+    # bcrypt runs on a dedicated pool: concurrent hashes, and how many more may wait before 503
+    PASSWORD_HASH_WORKERS: int = Field(2, env="PASSWORD_HASH_WORKERS")
+    PASSWORD_HASH_QUEUE_DEPTH: int = Field(32, env="PASSWORD_HASH_QUEUE_DEPTH")
+    # Token revocation (logout): per-worker bloom filter sizing, how often workers pick up
+    # each other's revocations, and how often the filter is rebuilt to drop expired tokens
+    REVOCATION_BLOOM_CAPACITY: int = Field(100000, env="REVOCATION_BLOOM_CAPACITY")
+    REVOCATION_BLOOM_FP_RATE: float = Field(0.001, env="REVOCATION_BLOOM_FP_RATE")
+    REVOCATION_SYNC_SECONDS: float = Field(5.0, env="REVOCATION_SYNC_SECONDS")
+    REVOCATION_REBUILD_SECONDS: float = Field(3600.0, env="REVOCATION_REBUILD_SECONDS")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(60, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(14, env="REFRESH_TOKEN_EXPIRE_DAYS")
     
@@ -28,6 +100,12 @@ class Settings(BaseSettings):
     OPENAI_STT_MODEL: str = Field("whisper-1", env="OPENAI_STT_MODEL")
     OPENAI_REALTIME_MODEL: str = Field("gpt-4o-realtime-preview-2024-10-01", env="OPENAI_REALTIME_MODEL")
 
+    # Streaming V2V ("stream": true): concurrent per-sentence TTS requests per reply, and the
+    # sentence length bounds (shorter fragments are merged, longer ones cut at a clause break)
+    V2V_STREAM_TTS_CONCURRENCY: int = Field(3, env="V2V_STREAM_TTS_CONCURRENCY")
+    V2V_STREAM_MIN_SENTENCE_CHARS: int = Field(10, env="V2V_STREAM_MIN_SENTENCE_CHARS")
+    V2V_STREAM_MAX_SENTENCE_CHARS: int = Field(250, env="V2V_STREAM_MAX_SENTENCE_CHARS")
+
     # Groq configuration
     GROQ_API_KEY: str = Field("", env="GROQ_API_KEY")
     GROQ_MODEL: str = Field("llama-3.1-70b-versatile", env="GROQ_MODEL")
@@ -0,0 +1,138 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Hashable, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from .config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class CountMode(str, Enum):
+    exact = "exact"
+    estimated = "estimated"
+
+
+class CountCache:
+    """Bounded TTL cache of exact COUNT(*) results.
+
+    Entries are grouped by table and an optional scope (e.g. a user id) so a
+    write only drops the counts it can affect. Invalidation is per worker;
+    the TTL bounds how stale another worker's cached count can get.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable, Hashable], Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, table: str, scope: Hashable, key: Hashable) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get((table, scope, key))
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[(table, scope, key)]
+                return None
+            return value
+
+    def set(self, table: str, scope: Hashable, key: Hashable, value: int):
+        with self._lock:
+            self._entries[(table, scope, key)] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end((table, scope, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table: str, scope: Hashable = None):
+        """Drop counts for ``table``; with ``scope`` only that scope's counts."""
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == table and (scope is None or k[1] == scope)]:
+                del self._entries[entry_key]
+
+
+count_cache = CountCache(
+    ttl=settings.COUNT_CACHE_TTL_SECONDS,
+    max_entries=settings.COUNT_CACHE_MAX_ENTRIES,
+)
+
+
+def _cache_key(query: Select) -> Hashable:
+    compiled = query.compile()
+    return str(compiled), tuple(sorted((k, repr(v)) for k, v in compiled.params.items()))
+
+
+def _explain_statement(query: Select, dialect: Dialect) -> Tuple[str, Any]:
+    """``EXPLAIN`` of ``query`` with its parameters in ``dialect``'s paramstyle.
+
+    Parameters stay bound rather than rendered with literal_binds, which has
+    no renderer for types like the REGCONFIG argument of websearch_to_tsquery.
+    """
+    compiled = query.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    return f"EXPLAIN (FORMAT JSON) {compiled.string}", params
+
+
+async def _estimate(db: AsyncSession, query: Select, table: str) -> Optional[int]:
+    """Planner row estimate, or None when the backend can't provide one."""
+    try:
+        # Savepoint: a failed probe must not abort the caller's transaction
+        async with db.begin_nested():
+            # reltuples counts every row, so it only answers queries without a WHERE clause
+            if query.whereclause is None:
+                reltuples = await db.scalar(
+                    text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+                    {"table": table},
+                )
+                # -1 means the table has never been analyzed
+                return int(reltuples) if reltuples is not None and reltuples >= 0 else None
+            sql, params = _explain_statement(query, db.get_bind().dialect)
+            # exec_driver_sql: the statement is already in the driver's paramstyle
+            conn = await db.connection()
+            plan = (await conn.exec_driver_sql(sql, params)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.warning(f"Row estimate for {table} unavailable, counting exactly: {e}")
+        return None
+
+
+async def count_rows(
+    db: AsyncSession,
+    query: Select,
+    table: str,
+    scope: Hashable = None,
+    mode: CountMode = CountMode.exact,
+) -> Tuple[int, bool]:
+    """Total rows matched by ``query`` as ``(total, is_estimate)``.
+
+    ``exact`` serves a cached COUNT(*) that writers invalidate through
+    ``count_cache.invalidate``. ``estimated`` asks the planner instead
+    (``pg_class.reltuples`` when ``query`` has no WHERE clause, EXPLAIN of
+    the actual predicate otherwise) and falls back to the exact count for
+    small results, where estimates are poor and counting is cheap anyway.
+    """
+    if mode == CountMode.estimated:
+        estimate = await _estimate(db, query, table)
+        if estimate is not None and estimate >= settings.COUNT_ESTIMATE_MIN_ROWS:
+            return estimate, True
+
+    key = _cache_key(query)
+    total = count_cache.get(table, scope, key)
+    if total is None:
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        count_cache.set(table, scope, key, total)
+    return total, False
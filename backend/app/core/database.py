@@ -1,16 +1,80 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 import logging
 
 from .config import get_settings
+from .db_metrics import PoolMetrics, timed_pool_class, install_statement_logging
 
 settings = get_settings()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+
+def to_async_url(url: str) -> str:
+    """Swap the sync Postgres driver in a DATABASE_URL for asyncpg."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
+pool_metrics = {
+    "sync": PoolMetrics("sync"),
+    "async": PoolMetrics("async"),
+}
+
+# Sync engine is kept for Alembic and scripts; request handlers use the async one.
+engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=timed_pool_class(QueuePool, pool_metrics["sync"]),
+    **_pool_options(),
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL),
+    poolclass=timed_pool_class(AsyncAdaptedQueuePool, pool_metrics["async"]),
+    **_pool_options(),
+)
+
+replica_urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+replica_engines = []
+for index, replica_url in enumerate(replica_urls):
+    pool_metrics[f"replica-{index}"] = PoolMetrics(f"replica-{index}")
+    replica_engines.append(create_async_engine(
+        to_async_url(replica_url),
+        poolclass=timed_pool_class(AsyncAdaptedQueuePool, pool_metrics[f"replica-{index}"]),
+        **_pool_options(),
+    ))
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+for _engine in (engine, async_engine.sync_engine, *(replica.sync_engine for replica in replica_engines)):
+    install_statement_logging(
+        _engine,
+        sample_every=settings.DB_ECHO_SAMPLE_RATE,
+        slow_ms=settings.DB_SLOW_QUERY_MS,
+    )
+
 Base = declarative_base()
 
 def get_db():
@@ -18,4 +82,20 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_pool_status() -> dict:
+    """Live pool occupancy and checkout wait times for every engine."""
+    status = {
+        "sync": pool_metrics["sync"].snapshot(engine.pool),
+        "async": pool_metrics["async"].snapshot(async_engine.sync_engine.pool),
+    }
+    for index, replica in enumerate(replica_engines):
+        status[f"replica-{index}"] = pool_metrics[f"replica-{index}"].snapshot(replica.sync_engine.pool)
+    return status
@@ -0,0 +1,104 @@
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Dict, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+logger = logging.getLogger("app.sql")
+
+
+class PoolMetrics:
+    """Checkout counters and wait times for one connection pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_checkout(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        with self._lock:
+            avg_wait = self.wait_total / self.checkouts if self.checkouts else 0.0
+            stats = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(avg_wait * 1000, 3),
+                "max_wait_ms": round(self.wait_max * 1000, 3),
+            }
+        # QueuePool exposes live sizing; other pool classes (NullPool, StaticPool) do not
+        for attr in ("size", "checkedin", "checkedout", "overflow"):
+            getter = getattr(pool, attr, None)
+            if callable(getter):
+                stats[attr] = getter()
+        return stats
+
+
+class _TimedCheckoutMixin:
+    """Time every pool checkout, including waiting for a free slot."""
+
+    metrics: PoolMetrics
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+def timed_pool_class(base: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """Build a pool subclass bound to ``metrics``.
+
+    The metrics live on the class so they survive ``Engine.dispose()``,
+    which recreates the pool from its class.
+    """
+    return type(f"Timed{base.__name__}", (_TimedCheckoutMixin, base), {"metrics": metrics})
+
+
+def install_statement_logging(engine: Engine, sample_every: int = 0, slow_ms: int = 0):
+    """Log every Nth statement and/or statements slower than ``slow_ms``.
+
+    Replaces ``echo=True``, which logs every statement synchronously.
+    Both knobs at 0 leaves the engine untouched.
+    """
+    if sample_every <= 0 and slow_ms <= 0:
+        return
+
+    counter = itertools.count(1)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _log_statement(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+        if slow_ms > 0 and elapsed_ms >= slow_ms:
+            logger.warning("Slow query (%.1f ms): %s", elapsed_ms, statement)
+        elif sample_every > 0 and next(counter) % sample_every == 0:
+            logger.info("SQL (%.1f ms): %s", elapsed_ms, statement)
+
+    @event.listens_for(engine, "handle_error")
+    def _drop_timer(context):
+        timers = context.connection.info.get("query_start_time") if context.connection else None
+        if timers:
+            timers.pop()
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Optional, TypeVar
+
+from fastapi import HTTPException, status
+
+from .config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+class HashingPool:
+    """Dedicated, bounded thread pool for password hashing.
+
+    bcrypt takes a few hundred milliseconds of CPU per call and releases the
+    GIL while doing it, so running it here keeps the event loop free. At most
+    ``workers`` calls run at once and ``queue_depth`` more may wait; anything
+    beyond that is refused with 503 instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, queue_depth: int):
+        self.workers = workers
+        self.capacity = workers + queue_depth
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        # Released from the worker thread, so guarded by a lock
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self._queue_seconds: Deque[float] = deque(maxlen=10000)
+        self._run_seconds: Deque[float] = deque(maxlen=10000)
+
+    def _timed(self, submitted: float, fn: Callable[..., T], *args) -> T:
+        started = time.perf_counter()
+        self._queue_seconds.append(started - submitted)
+        try:
+            return fn(*args)
+        finally:
+            self._run_seconds.append(time.perf_counter() - started)
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._admitted >= self.capacity:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication is busy, retry shortly",
+                    headers={"Retry-After": "1"}
+                )
+            self._admitted += 1
+        future = self._executor.submit(self._timed, time.perf_counter(), fn, *args)
+        # Release the slot from the executor's own future: it completes when the
+        # bcrypt thread returns (or the queued call is dropped), whereas the
+        # asyncio wrapper completes as soon as a waiting caller is cancelled
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future):
+        with self._lock:
+            self._admitted -= 1
+            self.completed += 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def status(self) -> dict:
+        def percentile(values, fraction: float) -> Optional[float]:
+            samples = sorted(values)
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000, 2)
+
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": self._admitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_ms_p50": percentile(self._queue_seconds, 0.50),
+            "queue_ms_p99": percentile(self._queue_seconds, 0.99),
+            "hash_ms_p50": percentile(self._run_seconds, 0.50),
+            "hash_ms_p99": percentile(self._run_seconds, 0.99),
+        }
+
+
+hashing_pool = HashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_depth=settings.PASSWORD_HASH_QUEUE_DEPTH,
+)
@@ -0,0 +1,5 @@
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches ``etag`` (weak comparison)."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
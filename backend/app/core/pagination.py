@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    payload = {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in values.items()
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *keys: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor, requiring ``keys``.
+
+    Timestamp keys (``*_at``) are turned back into datetimes.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = {key: payload[key] for key in keys}
+        for key in keys:
+            if key.endswith("_at"):
+                values[key] = datetime.fromisoformat(values[key])
+        if "id" in values:
+            values["id"] = int(values["id"])
+        return values
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def next_cursor_for(rows: list, size: int, *keys: str) -> Optional[str]:
+    """Cursor for the page after ``rows``, or None on the last page.
+
+    Callers fetch ``size + 1`` rows; the extra row only signals that more
+    data exists and is trimmed off by the caller.
+    """
+    if len(rows) <= size:
+        return None
+    last = rows[size - 1]
+    return encode_cursor({key: getattr(last, key) for key in keys})
@@ -0,0 +1,147 @@
+import itertools
+import math
+import logging
+import time
+from typing import Dict, List, Optional
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .database import AsyncSessionLocal, async_engine, replica_engines, get_async_db
+from .security import decode_token
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# 0 when the replica has replayed everything it received (or when the URL
+# points at a primary, where both LSN functions return NULL).
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaRouter:
+    """Picks the engine for read-only sessions.
+
+    Replicas are used round-robin while their replication lag is under
+    ``max_lag``; otherwise reads fall back to the primary. A user who has
+    just committed a write reads from the primary for ``sticky_seconds`` so
+    they see their own changes. Stickiness is tracked per worker process.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: List[AsyncEngine],
+        max_lag: float,
+        check_interval: float,
+        sticky_seconds: float,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        self._lag: Dict[int, float] = {index: 0.0 for index in range(len(replicas))}
+        self._checked_at: Dict[int, float] = {index: 0.0 for index in range(len(replicas))}
+        self._recent_writes: Dict[int, float] = {}
+        self._round_robin = itertools.count()
+
+    def mark_write(self, user_id: int):
+        now = time.monotonic()
+        self._recent_writes[user_id] = now
+        if len(self._recent_writes) > 10000:
+            cutoff = now - self.sticky_seconds
+            self._recent_writes = {uid: at for uid, at in self._recent_writes.items() if at > cutoff}
+
+    def is_sticky(self, user_id: Optional[int]) -> bool:
+        if user_id is None:
+            return False
+        written_at = self._recent_writes.get(user_id)
+        return written_at is not None and time.monotonic() - written_at < self.sticky_seconds
+
+    async def _replica_lag(self, index: int) -> float:
+        now = time.monotonic()
+        if now - self._checked_at[index] < self.check_interval:
+            return self._lag[index]
+        # Claim the check before awaiting so concurrent requests don't stampede it
+        self._checked_at[index] = now
+        try:
+            async with self.replicas[index].connect() as conn:
+                lag = float(await conn.scalar(REPLICA_LAG_SQL))
+        except Exception as e:
+            logger.warning(f"Replica {index} lag check failed: {e}")
+            lag = float("inf")
+        self._lag[index] = lag
+        return lag
+
+    async def engine_for(self, user_id: Optional[int] = None) -> AsyncEngine:
+        if not self.replicas or self.is_sticky(user_id):
+            return self.primary
+        start = next(self._round_robin)
+        for offset in range(len(self.replicas)):
+            index = (start + offset) % len(self.replicas)
+            if await self._replica_lag(index) <= self.max_lag:
+                return self.replicas[index]
+        return self.primary
+
+    def status(self) -> dict:
+        return {
+            "replicas": len(self.replicas),
+            # None marks a replica whose last lag check failed
+            "lag_seconds": [
+                None if math.isinf(self._lag[index]) else self._lag[index]
+                for index in range(len(self.replicas))
+            ],
+            "sticky_users": sum(1 for uid in self._recent_writes if self.is_sticky(uid)),
+        }
+
+
+replica_router = ReplicaRouter(
+    primary=async_engine,
+    replicas=replica_engines,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL,
+    sticky_seconds=settings.READ_YOUR_WRITES_SECONDS,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_write(session: Session):
+    # get_current_user tags the request's primary session with the user id
+    user_id = session.info.get("user_id")
+    if user_id is not None:
+        replica_router.mark_write(user_id)
+
+
+def _request_user_id(request: Request) -> Optional[int]:
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        sub = decode_token(token).get("sub")
+        return int(sub) if sub is not None else None
+    except (HTTPException, ValueError):
+        return None
+
+
+async def get_async_read_db(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Session for read-only endpoints, bound to a replica when one is usable.
+
+    Falls back to the request's primary session, which only checks out a
+    connection if it is actually used.
+    """
+    if not replica_router.replicas:
+        yield db
+        return
+    bind = await replica_router.engine_for(_request_user_id(request))
+    if bind is replica_router.primary:
+        yield db
+        return
+    async with AsyncSessionLocal(bind=bind) as replica_db:
+        yield replica_db
@@ -0,0 +1,172 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database.models import RevokedToken
+
+from .config import get_settings
+from .database import AsyncSessionLocal
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings (no false negatives)."""
+
+    def __init__(self, capacity: int, fp_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.sha256(item.encode()).digest()
+        # Double hashing: k positions from two 64-bit halves of one digest
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class TokenDenylist:
+    """Revoked JWT ids: a per-worker bloom filter in front of revoked_tokens.
+
+    A jti the filter has never seen is not revoked, so almost every request
+    is answered in memory; only possible hits are confirmed with the
+    database. Each worker pulls other workers' revocations every
+    ``sync_seconds`` and rebuilds the filter every ``rebuild_seconds`` to
+    forget expired tokens, so a logout reaches every worker within
+    ``sync_seconds``.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float, sync_seconds: float, rebuild_seconds: float):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.sync_seconds = sync_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self._filter = BloomFilter(capacity, fp_rate)
+        self._synced_through: Optional[datetime] = None
+        self._rebuilt_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self.checks = 0
+        self.possible_hits = 0
+        self.confirmed = 0
+
+    async def revoke(self, jti: str, expires_at: datetime):
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                insert(RevokedToken)
+                .values(jti=jti, expires_at=expires_at)
+                .on_conflict_do_nothing(index_elements=["jti"])
+            )
+            await db.commit()
+        self._filter.add(jti)
+
+    async def is_revoked(self, jti: Optional[str]) -> bool:
+        if not jti:
+            return False
+        self.checks += 1
+        if jti not in self._filter:
+            return False
+        self.possible_hits += 1
+        async with AsyncSessionLocal() as db:
+            revoked = await db.scalar(select(RevokedToken.jti).where(RevokedToken.jti == jti))
+        if revoked is not None:
+            self.confirmed += 1
+        return revoked is not None
+
+    async def rebuild(self):
+        """Reload the filter from unexpired rows and prune expired ones."""
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(RevokedToken).where(RevokedToken.expires_at < _utcnow()))
+            await db.commit()
+            result = await db.execute(select(RevokedToken.jti, RevokedToken.revoked_at))
+            rows = result.all()
+        bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.fp_rate)
+        for jti, _ in rows:
+            bloom.add(jti)
+        # Revocations from this worker that landed after the SELECT are re-added by the next sync
+        self._filter = bloom
+        # revoked_at is database time; with no rows yet, the next sync simply reads the whole table
+        self._synced_through = max((revoked_at for _, revoked_at in rows), default=None)
+        self._rebuilt_at = time.monotonic()
+
+    async def sync(self):
+        """Add revocations made since the last sync (by any worker)."""
+        if self._rebuilt_at is None or time.monotonic() - self._rebuilt_at >= self.rebuild_seconds:
+            await self.rebuild()
+            return
+        query = select(RevokedToken.jti, RevokedToken.revoked_at)
+        if self._synced_through is not None:
+            # Overlap the watermark so rows that committed late are not skipped; re-adding is harmless
+            query = query.where(RevokedToken.revoked_at >= self._synced_through - timedelta(seconds=self.sync_seconds))
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(query)).all()
+        for jti, revoked_at in rows:
+            self._filter.add(jti)
+            if self._synced_through is None or revoked_at > self._synced_through:
+                self._synced_through = revoked_at
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sync_seconds)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Token denylist sync failed: {e}")
+
+    async def start(self):
+        try:
+            await self.rebuild()
+        except Exception as e:
+            # Not fatal: the background sync retries the load
+            logger.warning(f"Token denylist load failed: {e}")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> dict:
+        return {
+            "filter_inserts": self._filter.count,
+            "filter_bits": self._filter.size,
+            "checks": self.checks,
+            "possible_hits": self.possible_hits,
+            "confirmed": self.confirmed,
+            "synced_through": self._synced_through.isoformat() if self._synced_through else None,
+        }
+
+
+token_denylist = TokenDenylist(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    fp_rate=settings.REVOCATION_BLOOM_FP_RATE,
+    sync_seconds=settings.REVOCATION_SYNC_SECONDS,
+    rebuild_seconds=settings.REVOCATION_REBUILD_SECONDS,
+)
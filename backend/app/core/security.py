@@ -1,14 +1,20 @@
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
+from uuid import uuid4
 
 from fastapi import HTTPException, status, Depends, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import jwt, JWTError
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.hashing import hashing_pool
+from app.core.revocation import token_denylist
+from app.core.token_cache import token_cache
+from app.core.user_cache import CurrentUser, user_cache
 from app.database.models import User
 
 settings = get_settings()
@@ -21,6 +27,8 @@ REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
+# Same scheme, but a missing token yields None instead of 401
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token", auto_error=False)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -31,9 +39,20 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
-    user = db.query(User).filter(User.username == username).first()
-    if not user or not verify_password(password, user.hashed_password):
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """``verify_password`` on the hashing pool; use this from request handlers."""
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """``get_password_hash`` on the hashing pool; use this from request handlers."""
+    return await hashing_pool.run(get_password_hash, password)
+
+
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.username == username))
+    user = result.scalars().first()
+    if not user or not await verify_password_async(password, user.hashed_password):
         return None
     return user
 
@@ -41,33 +60,64 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 def decode_token(token: str) -> dict:
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+    """Verified payload of ``token``, from ``token_cache`` when it was seen recently."""
+    key = token_cache.key(token)
+    found, payload = token_cache.get(key)
+    if not found:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            token_cache.set_rejected(key)
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        token_cache.set(key, payload)
+    if payload is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    # Callers get their own copy; the cached payload is shared
+    return dict(payload)
+
+async def ensure_not_revoked(payload: dict):
+    """Reject a decoded token whose jti was revoked (e.g. by logout)."""
+    if await token_denylist.is_revoked(payload.get("jti")):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+
+async def revoke_token(token: str):
+    """Revoke ``token`` until its exp; invalid or jti-less tokens are ignored."""
+    try:
+        payload = decode_token(token)
+    except HTTPException:
+        return
+    if payload.get("jti") and payload.get("exp"):
+        await token_denylist.revoke(payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),) -> User:
-
+    db: AsyncSession = Depends(get_async_db),) -> CurrentUser:
+    """Authenticated caller as a ``CurrentUser`` snapshot, served from ``user_cache`` when fresh."""
     payload = decode_token(token)
     user_id: Optional[int] = payload.get("sub")
     if user_id is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    await ensure_not_revoked(payload)
+    user = user_cache.get(int(user_id))
     if user is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        result = await db.execute(select(User).where(User.id == int(user_id)))
+        row = result.scalars().first()
+        if row is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        user = CurrentUser.from_orm(row)
+        user_cache.set(user)
+    # Lets the replica router keep this user's reads on the primary after a write
+    db.info["user_id"] = user.id
     return user
 
 async def get_current_user_from_token(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),) -> User:
+    db: AsyncSession = Depends(get_async_db),) -> CurrentUser:
     """Alternative function for getting current user from token."""
     return await get_current_user(token, db)
 
@@ -75,7 +125,7 @@ def create_refresh_token(data: dict, expires_delta: timedelta | None = None):
     """Return a signed JWT refresh token."""
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def decode_refresh_token(token: str) -> dict:
@@ -0,0 +1,93 @@
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_M / 180
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoGrid:
+    """Points bucketed into fixed-size latitude/longitude cells.
+
+    A radius query only visits the cells overlapping the circle's bounding
+    box (wrapping across the antimeridian) and then filters candidates by
+    exact haversine distance. Points are added, moved and removed in O(1).
+    Not thread-safe; meant to be used from the event loop.
+    """
+
+    def __init__(self, cell_degrees: float):
+        self.cell_degrees = cell_degrees
+        self._lon_cells = math.ceil(360 / cell_degrees)
+        self._cells: Dict[Tuple[int, int], Dict[int, Tuple[float, float]]] = defaultdict(dict)
+        self._points: Dict[int, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (
+            math.floor(lat / self.cell_degrees),
+            math.floor((lon + 180) / self.cell_degrees) % self._lon_cells,
+        )
+
+    def upsert(self, key: int, lat: float, lon: float):
+        self.remove(key)
+        self._points[key] = (lat, lon)
+        self._cells[self._cell(lat, lon)][key] = (lat, lon)
+
+    def remove(self, key: int):
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        del self._cells[cell][key]
+        if not self._cells[cell]:
+            del self._cells[cell]
+
+    def replace_all(self, points: Iterable[Tuple[int, float, float]]):
+        self._cells.clear()
+        self._points.clear()
+        for key, lat, lon in points:
+            self.upsert(key, lat, lon)
+
+    def _candidate_cells(self, lat: float, lon: float, radius_m: float):
+        d_lat = radius_m / METERS_PER_DEGREE_LAT
+        lat_min, lat_max = max(lat - d_lat, -90.0), min(lat + d_lat, 90.0)
+        # Longitude degrees shrink towards the poles; near them every column qualifies
+        cos_lat = min(math.cos(math.radians(lat_min)), math.cos(math.radians(lat_max)))
+        if cos_lat <= 1e-9 or lat_min <= -90.0 or lat_max >= 90.0:
+            d_lon = 180.0
+        else:
+            d_lon = min(d_lat / cos_lat, 180.0)
+        rows = range(math.floor(lat_min / self.cell_degrees), math.floor(lat_max / self.cell_degrees) + 1)
+        first_column = math.floor((lon - d_lon + 180) / self.cell_degrees)
+        columns = min(math.floor((lon + d_lon + 180) / self.cell_degrees) - first_column + 1, self._lon_cells)
+        if len(rows) * columns >= len(self._cells):
+            # Cheaper to walk the occupied cells than to probe every candidate
+            return list(self._cells.values())
+        return [
+            self._cells[(row, (first_column + offset) % self._lon_cells)]
+            for row in rows
+            for offset in range(columns)
+            if (row, (first_column + offset) % self._lon_cells) in self._cells
+        ]
+
+    def nearby(self, lat: float, lon: float, radius_m: float, limit: int) -> List[Tuple[int, float]]:
+        """Keys within ``radius_m`` of the point as ``(key, distance_m)``, closest first."""
+        matches = []
+        for cell in self._candidate_cells(lat, lon, radius_m):
+            for key, (point_lat, point_lon) in cell.items():
+                distance = haversine_m(lat, lon, point_lat, point_lon)
+                if distance <= radius_m:
+                    matches.append((key, distance))
+        matches.sort(key=lambda match: match[1])
+        return matches[:limit]
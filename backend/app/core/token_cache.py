@@ -0,0 +1,84 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .config import get_settings
+
+settings = get_settings()
+
+
+class TokenCache:
+    """Bounded LRU of verified JWT payloads keyed by the token's SHA-256.
+
+    A payload is served until the token's own ``exp``, so a cached token
+    never outlives what ``jwt.decode`` would accept. Tokens that just failed
+    verification are remembered for ``negative_ttl`` seconds so a client
+    retrying a bad token doesn't cost a verification each time.
+    """
+
+    def __init__(self, max_entries: int, negative_ttl: float):
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        # digest -> (payload or None for a rejected token, expiry as epoch seconds)
+        self._entries: "OrderedDict[bytes, Tuple[Optional[dict], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, key: bytes) -> Tuple[bool, Optional[dict]]:
+        """``(found, payload)``; a found ``None`` payload is a cached rejection."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            if entry[0] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, entry[0]
+
+    def _put(self, key: bytes, payload: Optional[dict], expires_at: float):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def set(self, key: bytes, payload: dict):
+        exp = payload.get("exp")
+        # Tokens without an expiry are verified every time rather than cached forever
+        if isinstance(exp, (int, float)):
+            self._put(key, payload, float(exp))
+
+    def set_rejected(self, key: bytes):
+        if self.negative_ttl > 0:
+            self._put(key, None, time.time() + self.negative_ttl)
+
+    def status(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else None,
+        }
+
+
+token_cache = TokenCache(
+    max_entries=settings.JWT_CACHE_MAX_ENTRIES,
+    negative_ttl=settings.JWT_CACHE_NEGATIVE_TTL_SECONDS,
+)
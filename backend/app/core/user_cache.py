@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+from .config import get_settings
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Detached, read-only copy of a ``users`` row for the authenticated caller.
+
+    Safe to share between requests; code that changes the user loads the row
+    in its own session and calls ``user_cache.invalidate`` after committing.
+    """
+    id: int
+    username: str
+    hashed_password: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    is_active: bool
+    is_deleted: bool
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_orm(cls, user) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            hashed_password=user.hashed_password,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            is_active=user.is_active,
+            is_deleted=user.is_deleted,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+class UserCache:
+    """Bounded TTL cache of ``CurrentUser`` snapshots keyed by user id.
+
+    Invalidation is per worker; the TTL bounds how long another worker can
+    keep serving a user's previous state.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[CurrentUser, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[CurrentUser]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, user: CurrentUser):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def status(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+user_cache = UserCache(
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+)
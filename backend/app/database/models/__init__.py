@@ -2,4 +2,7 @@ from .user import User
 from .stt import Stt
 from .tts import Tts
 from .coin import Coin
-from .user_coin_collection import UserCoinCollection 
\ No newline at end of file
+from .user_coin_collection import UserCoinCollection
+from .collection_stats import UserCollectionStats, CoinCatalogStats
+from .guest_coin_collection import GuestCoinCollection
+from .revoked_token import RevokedToken
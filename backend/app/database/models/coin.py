@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -19,6 +19,10 @@ class Coin(Base):
     ar_position_y = Column(Float, nullable=True, default=0.0)
     ar_position_z = Column(Float, nullable=True, default=0.0)
     
+    # Геопозиция монеты (GET /coins/nearby ищет по in-memory индексу, не по БД)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    
     # Метаданные
     is_active = Column(Boolean, nullable=False, default=True)
     is_deleted = Column(Boolean, nullable=False, default=False)
@@ -27,4 +31,12 @@ class Coin(Base):
     updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
     
     # Relationships
-    user_collections = relationship("UserCoinCollection", back_populates="coin", cascade="all, delete-orphan")
\ No newline at end of file
+    user_collections = relationship("UserCoinCollection", back_populates="coin", cascade="all, delete-orphan")
+
+    # Trigram indexes for substring/similarity search (pg_trgm); delta sync by (updated_at, id)
+    __table_args__ = (
+        Index("ix_coins_updated_at_id", "updated_at", "id"),
+        Index("ix_coins_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_coins_symbol_trgm", "symbol", postgresql_using="gin", postgresql_ops={"symbol": "gin_trgm_ops"}),
+        Index("ix_coins_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
+    )
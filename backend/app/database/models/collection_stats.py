@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class UserCollectionStats(Base):
+    """Per-user collection counters, kept in step with user_coin_collections."""
+    __tablename__ = "user_collection_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    # Active collections; equal to distinct coins since a coin is actively collected at most once
+    collected_coins = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
+
+
+class CoinCatalogStats(Base):
+    """Single-row catalog counters (id = 1), kept in step with coins."""
+    __tablename__ = "coin_catalog_stats"
+
+    id = Column(Integer, primary_key=True)
+    active_coins = Column(Integer, nullable=False, default=0)
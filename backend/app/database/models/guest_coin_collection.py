@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class GuestCoinCollection(Base):
+    """Coins collected through the public AR endpoint, keyed by a device/guest token."""
+    __tablename__ = "guest_coin_collections"
+
+    id = Column(Integer, primary_key=True, index=True)
+    guest_token = Column(String(64), nullable=False)
+    coin_id = Column(Integer, ForeignKey("coins.id"), nullable=False)
+    collected_at = Column(DateTime, nullable=False, default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("guest_token", "coin_id", name="uq_guest_coin_collections_guest_coin"),
+    )
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class RevokedToken(Base):
+    """JWTs revoked before their exp (e.g. by logout), keyed by the token's jti claim."""
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    # The token's own exp; rows past it are dead weight and get pruned
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=False, default=func.now(), index=True)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, Date, Float, DateTime, ForeignKey, LargeBinary
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, Date, Float, DateTime, ForeignKey, LargeBinary, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 
 from app.core.database import Base
@@ -10,8 +11,24 @@ class Tts(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     text = Column(String, nullable=False)
-    audio = Column(LargeBinary, nullable=False)
+    # Legacy inline audio; new clips live in the blob store, keyed by audio_sha256
+    audio = Column(LargeBinary, nullable=True)
+    audio_sha256 = Column(String(64), nullable=True, index=True)
+    audio_size = Column(Integer, nullable=True)
+    audio_mime_type = Column(String, nullable=True)
+    audio_duration_ms = Column(Integer, nullable=True)
 
     created_at = Column(DateTime, nullable=False, default=func.now())
 
-    user = relationship("User", back_populates="ttss")
\ No newline at end of file
+    # Full-text search document, kept current by PostgreSQL on every insert/update.
+    # 'simple' config: transcripts are multilingual, so no stemming or stop words.
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('simple', text)", persisted=True)))
+
+    user = relationship("User", back_populates="ttss")
+
+    # Keyset pagination: newest-first per user; GIN indexes for text search
+    __table_args__ = (
+        Index("ix_ttss_user_created_id", "user_id", "created_at", "id"),
+        Index("ix_ttss_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_ttss_text_trgm", "text", postgresql_using="gin", postgresql_ops={"text": "gin_trgm_ops"}),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -17,7 +17,15 @@ class UserCoinCollection(Base):
     user = relationship("User", back_populates="coin_collections")
     coin = relationship("Coin", back_populates="user_collections")
 
-    # Composite unique constraint to prevent duplicate collections
+    # A coin can be actively collected once per user; removed (inactive) rows don't count
     __table_args__ = (
-        {"extend_existing": True}
+        Index(
+            "uq_user_coin_collections_active",
+            "user_id",
+            "coin_id",
+            unique=True,
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active"),
+        ),
+        {"extend_existing": True},
     )
@@ -4,18 +4,47 @@ from fastapi import Depends
 
 import asyncio
 import logging
+from contextlib import asynccontextmanager
 
 
 from app.core.config import get_settings
-from app.core.database import Base, engine
+from app.core.database import Base, engine, async_engine, replica_engines, get_pool_status, AsyncSessionLocal
+from app.core.replica import replica_router
+from app.core.hashing import hashing_pool
+from app.core.revocation import token_denylist
+from app.core.token_cache import token_cache
+from app.core.user_cache import user_cache
+from app.services.leaderboard import collector_leaderboard
+from app.services.guest_collections import guest_collection_buffer
 
 from app.api import api_router
 
 settings = get_settings()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        async with AsyncSessionLocal() as db:
+            await collector_leaderboard.refresh(db)
+    except Exception as e:
+        # Not fatal: the first leaderboard request loads it instead
+        logging.getLogger(__name__).warning(f"Leaderboard preload failed: {e}")
+    await token_denylist.start()
+    guest_collection_buffer.start()
+    yield
+    await token_denylist.stop()
+    # Drain buffered guest pickups while the engine can still write them
+    await guest_collection_buffer.stop()
+    hashing_pool.shutdown()
+    await async_engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     docs_url=None,  # Disable /docs
     redoc_url=None  # Disable /redoc
 )
@@ -35,3 +64,29 @@ app.include_router(api_router, prefix="/api/v1")
 @app.get("/api/health")
 async def health_check():
     return {"status": "ok", "message": "Service is running"}
+
+
+@app.get("/api/health/db")
+async def database_pool_status():
+    return {"status": "ok", "pools": get_pool_status(), "replication": replica_router.status()}
+
+
+@app.get("/api/health/auth")
+async def auth_cache_status():
+    return {
+        "status": "ok",
+        "token_cache": token_cache.status(),
+        "user_cache": user_cache.status(),
+        "password_hashing": hashing_pool.status(),
+        "revocation": token_denylist.status(),
+    }
+
+
+@app.get("/api/health/leaderboard")
+async def leaderboard_status():
+    return {"status": "ok", "leaderboard": collector_leaderboard.status()}
+
+
+@app.get("/api/health/guest-collections")
+async def guest_collections_status():
+    return {"status": "ok", "buffer": guest_collection_buffer.status()}
@@ -0,0 +1,47 @@
+"""Counter updates for the collection summary.
+
+Each helper issues one atomic upsert; callers run it inside the transaction
+that changes the underlying rows, so counters commit or roll back with them.
+"""
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import CoinCatalogStats, UserCollectionStats
+
+CATALOG_STATS_ID = 1
+
+
+async def bump_collected_coins(db: AsyncSession, user_id: int, delta: int) -> int:
+    """Adjust the user's count and return the new value."""
+    stmt = insert(UserCollectionStats).values(user_id=user_id, collected_coins=max(delta, 0))
+    return await db.scalar(stmt.on_conflict_do_update(
+        index_elements=[UserCollectionStats.user_id],
+        set_={
+            "collected_coins": UserCollectionStats.collected_coins + delta,
+            "updated_at": func.now()
+        }
+    ).returning(UserCollectionStats.collected_coins))
+
+
+async def bump_active_coins(db: AsyncSession, delta: int):
+    if not delta:
+        return
+    stmt = insert(CoinCatalogStats).values(id=CATALOG_STATS_ID, active_coins=max(delta, 0))
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[CoinCatalogStats.id],
+        set_={"active_coins": CoinCatalogStats.active_coins + delta}
+    ))
+
+
+async def get_collection_counters(db: AsyncSession, user_id: int):
+    """``(collected_coins, active_coins)`` read in one round trip."""
+    row = (await db.execute(select(
+        select(UserCollectionStats.collected_coins)
+        .where(UserCollectionStats.user_id == user_id)
+        .scalar_subquery(),
+        select(CoinCatalogStats.active_coins)
+        .where(CoinCatalogStats.id == CATALOG_STATS_ID)
+        .scalar_subquery()
+    ))).one()
+    return row[0] or 0, row[1] or 0
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.database.models import Coin, GuestCoinCollection
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# (guest_token, coin_id, collected_at)
+GuestPickup = Tuple[str, int, datetime]
+
+
+class GuestCollectionBuffer:
+    """Write-behind buffer for guest coin collections.
+
+    Requests only append to a bounded in-memory queue. A background task
+    writes it out in batches once GUEST_FLUSH_BATCH_SIZE pickups are waiting
+    or every GUEST_FLUSH_INTERVAL_SECONDS, and ``stop`` drains it on
+    shutdown. Pickups buffered when a worker dies without a clean shutdown
+    are lost; that is the price of keeping the public path off the database.
+    """
+
+    def __init__(self, max_items: int, batch_size: int, flush_interval: float):
+        self.max_items = max_items
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._items: Deque[GuestPickup] = deque()
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.accepted = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.skipped = 0
+        self.failed_flushes = 0
+
+    def offer(self, guest_token: str, coin_id: int) -> bool:
+        """Queue a pickup; False when the buffer is full."""
+        if len(self._items) >= self.max_items:
+            self.rejected += 1
+            return False
+        self._items.append((guest_token, coin_id, datetime.now(timezone.utc).replace(tzinfo=None)))
+        self.accepted += 1
+        if len(self._items) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def _write(self, batch) -> int:
+        """Store a batch of pickups and return how many new rows were inserted."""
+        # First pickup per (guest, coin) wins, matching ON CONFLICT DO NOTHING for stored rows
+        unique = {}
+        for guest_token, coin_id, collected_at in batch:
+            unique.setdefault((guest_token, coin_id), collected_at)
+        async with AsyncSessionLocal() as db:
+            # Unknown or inactive coins are dropped instead of failing the whole batch
+            result = await db.execute(
+                select(Coin.id).where(
+                    Coin.id.in_({coin_id for _, coin_id in unique}),
+                    Coin.is_active == True,
+                    Coin.is_deleted == False
+                )
+            )
+            valid = set(result.scalars().all())
+            rows = [
+                {"guest_token": guest_token, "coin_id": coin_id, "collected_at": collected_at}
+                for (guest_token, coin_id), collected_at in unique.items()
+                if coin_id in valid
+            ]
+            if not rows:
+                return 0
+            # RETURNING only yields rows that were actually inserted, not the conflicting ones
+            result = await db.execute(
+                insert(GuestCoinCollection).values(rows)
+                .on_conflict_do_nothing(index_elements=["guest_token", "coin_id"])
+                .returning(GuestCoinCollection.id)
+            )
+            inserted = len(result.scalars().all())
+            await db.commit()
+            return inserted
+
+    async def flush(self) -> bool:
+        """Write out everything buffered; False if a batch failed and was re-queued."""
+        while self._items:
+            batch = [self._items.popleft() for _ in range(min(self.batch_size, len(self._items)))]
+            try:
+                inserted = await self._write(batch)
+            except Exception as e:
+                self.failed_flushes += 1
+                logger.error(f"Guest collection flush of {len(batch)} pickups failed: {e}")
+                # Put the batch back (oldest first) as far as capacity allows and retry later
+                room = self.max_items - len(self._items)
+                self._items.extendleft(reversed(batch[:room]))
+                return False
+            self.flushed += inserted
+            # Duplicates, repeat pickups and unknown or inactive coins
+            self.skipped += len(batch) - inserted
+        return True
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if not await self.flush():
+                # Back off instead of spinning on a database that is down
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self):
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write out whatever is still buffered."""
+        if self._task is not None:
+            # Signal rather than cancel so a batch being written isn't lost mid-flight
+            self._stopping.set()
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._items:
+            logger.error(f"Dropping {len(self._items)} guest pickups that could not be flushed")
+
+    def status(self) -> dict:
+        return {
+            "buffered": len(self._items),
+            "capacity": self.max_items,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "skipped": self.skipped,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+guest_collection_buffer = GuestCollectionBuffer(
+    max_items=settings.GUEST_BUFFER_MAX_ITEMS,
+    batch_size=settings.GUEST_FLUSH_BATCH_SIZE,
+    flush_interval=settings.GUEST_FLUSH_INTERVAL_SECONDS,
+)
@@ -0,0 +1,211 @@
+import asyncio
+import heapq
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.database.models import User, UserCollectionStats
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class Leaderboard:
+    """Users ranked by score, updated incrementally.
+
+    Users are bucketed by score and a Fenwick tree counts users per score,
+    so ``rank`` and ``set`` are O(log max_score) and ``top`` visits only the
+    buckets it returns. Ties share a rank (1 + users with a higher score) and
+    are listed by user id. Users with score 0 are not ranked.
+    """
+
+    def __init__(self):
+        self._scores: Dict[int, int] = {}
+        self._buckets: Dict[int, Set[int]] = {}
+        self._tree: List[int] = [0] * 65
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _add_count(self, score: int, delta: int):
+        if score >= len(self._tree) - 1:
+            counts = [0] * (max(score + 2, 2 * len(self._tree)) - 1)
+            for bucket_score, users in self._buckets.items():
+                counts[bucket_score] = len(users)
+            self._rebuild_tree(counts)
+        index = score + 1
+        while index < len(self._tree):
+            self._tree[index] += delta
+            index += index & -index
+
+    def _rebuild_tree(self, counts: List[int]):
+        tree = [0] + counts
+        for index in range(1, len(tree)):
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self._tree = tree
+
+    def _count_up_to(self, score: int) -> int:
+        index = min(score + 1, len(self._tree) - 1)
+        total = 0
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def set(self, user_id: int, score: int):
+        old = self._scores.pop(user_id, 0)
+        if old:
+            bucket = self._buckets[old]
+            bucket.discard(user_id)
+            if not bucket:
+                del self._buckets[old]
+            self._add_count(old, -1)
+        if score > 0:
+            # Count first: growing the tree recounts from the buckets
+            self._add_count(score, 1)
+            self._scores[user_id] = score
+            self._buckets.setdefault(score, set()).add(user_id)
+
+    def replace_all(self, scores: Dict[int, int]):
+        self._scores = {user_id: score for user_id, score in scores.items() if score > 0}
+        self._buckets = {}
+        for user_id, score in self._scores.items():
+            self._buckets.setdefault(score, set()).add(user_id)
+        size = max(self._buckets, default=0) + 2
+        counts = [0] * (max(64, 2 * size) - 1)
+        for score, users in self._buckets.items():
+            counts[score] = len(users)
+        self._rebuild_tree(counts)
+
+    def score(self, user_id: int) -> int:
+        return self._scores.get(user_id, 0)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        return 1 + len(self._scores) - self._count_up_to(score)
+
+    def top(self, limit: int) -> List[Tuple[int, int, int]]:
+        """Best ``limit`` users as ``(rank, user_id, score)``."""
+        entries = []
+        levels = [-score for score in self._buckets]
+        heapq.heapify(levels)
+        while levels and len(entries) < limit:
+            score = -heapq.heappop(levels)
+            rank = len(entries) + 1
+            for user_id in heapq.nsmallest(limit - len(entries), self._buckets[score]):
+                entries.append((rank, user_id, score))
+        return entries
+
+
+class CollectorLeaderboard:
+    """Per-worker ranking of users by collected coins.
+
+    Rebuilt from user_collection_stats at startup and every
+    LEADERBOARD_REFRESH_SECONDS (to see other workers' writes); collects and
+    removes in this worker update it immediately. Updates made while a
+    rebuild is reading are replayed on top of it, so the snapshot can't undo
+    them. Rebuilds read from the primary: a lagging replica would overwrite
+    scores this worker has just set.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.board = Leaderboard()
+        self.usernames: Dict[int, str] = {}
+        self.refresh_seconds = refresh_seconds
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        # Scores set by this worker while a rebuild is reading, keyed by user
+        self._pending: Optional[Dict[int, int]] = None
+        self._lookup_seconds: Deque[float] = deque(maxlen=10000)
+
+    def update(self, user_id: int, collected_coins: int):
+        self.board.set(user_id, collected_coins)
+        if self._pending is not None:
+            self._pending[user_id] = collected_coins
+
+    def remove(self, user_id: int):
+        """Drop a deactivated or deleted user from the board."""
+        self.update(user_id, 0)
+        self.usernames.pop(user_id, None)
+
+    async def refresh(self, db: AsyncSession):
+        async with self._lock:
+            await self._load(db)
+
+    async def _load(self, db: AsyncSession):
+        self._pending = {}
+        try:
+            result = await db.execute(
+                select(User.id, User.username, UserCollectionStats.collected_coins)
+                .join(UserCollectionStats, UserCollectionStats.user_id == User.id)
+                .where(
+                    User.is_active == True,
+                    User.is_deleted == False,
+                    UserCollectionStats.collected_coins > 0
+                )
+            )
+            rows = result.all()
+            self.board.replace_all({user_id: score for user_id, _, score in rows})
+            for user_id, score in self._pending.items():
+                self.board.set(user_id, score)
+            self.usernames = {user_id: username for user_id, username, _ in rows}
+            self._loaded_at = time.monotonic()
+        finally:
+            self._pending = None
+
+    async def ensure_fresh(self, db: AsyncSession):
+        if self._loaded_at is None:
+            # Nothing to serve yet: wait for a load in progress rather than answer from an empty board
+            async with self._lock:
+                if self._loaded_at is None:
+                    await self._load(db)
+        elif time.monotonic() - self._loaded_at >= self.refresh_seconds and not self._lock.locked():
+            # Stale but usable: one request rebuilds, the others keep reading the current board
+            await self.refresh(db)
+
+    async def _usernames(self, db: AsyncSession, user_ids: List[int]) -> Dict[int, str]:
+        missing = [user_id for user_id in user_ids if user_id not in self.usernames]
+        if missing:
+            result = await db.execute(select(User.id, User.username).where(User.id.in_(missing)))
+            self.usernames.update(dict(result.all()))
+        return {user_id: self.usernames.get(user_id, "") for user_id in user_ids}
+
+    async def standings(self, db: AsyncSession, user_id: Optional[int], limit: int):
+        """``(top entries, my entry or None)``; entries are ``(rank, user_id, username, score)``."""
+        await self.ensure_fresh(db)
+        started = time.perf_counter()
+        top = self.board.top(limit)
+        my_rank = self.board.rank(user_id) if user_id is not None else None
+        self._lookup_seconds.append(time.perf_counter() - started)
+
+        names = await self._usernames(db, [entry[1] for entry in top] + ([user_id] if my_rank else []))
+        entries = [(rank, uid, names[uid], score) for rank, uid, score in top]
+        me = (my_rank, user_id, names[user_id], self.board.score(user_id)) if my_rank else None
+        return entries, me
+
+    def status(self) -> dict:
+        samples = sorted(self._lookup_seconds)
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000, 4)
+
+        return {
+            "players": len(self.board),
+            "loaded": self._loaded_at is not None,
+            "lookup_ms_p50": percentile(0.50),
+            "lookup_ms_p99": percentile(0.99),
+        }
+
+
+collector_leaderboard = CollectorLeaderboard(refresh_seconds=settings.LEADERBOARD_REFRESH_SECONDS)
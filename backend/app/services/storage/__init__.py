@@ -0,0 +1,16 @@
+from .blob_store import BlobStore, BlobInfo, LocalBlobStore, BLOB_STORE_BACKENDS, get_blob_store
+from .audio import detect_mime_type, probe_audio, store_audio, load_audio
+from .http import audio_response
+
+__all__ = [
+    'BlobStore',
+    'BlobInfo',
+    'LocalBlobStore',
+    'BLOB_STORE_BACKENDS',
+    'get_blob_store',
+    'detect_mime_type',
+    'probe_audio',
+    'store_audio',
+    'load_audio',
+    'audio_response'
+]
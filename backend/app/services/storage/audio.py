@@ -0,0 +1,69 @@
+import asyncio
+import io
+import logging
+from typing import Optional, Tuple
+
+try:
+    # Optional: duration probing needs libsndfile
+    import soundfile  # type: ignore
+    _SOUNDFILE_AVAILABLE = True
+except Exception:
+    _SOUNDFILE_AVAILABLE = False
+
+from .blob_store import get_blob_store
+
+logger = logging.getLogger(__name__)
+
+
+def detect_mime_type(data: bytes) -> str:
+    """Audio MIME type from container magic bytes."""
+    if len(data) >= 12 and data.startswith(b"RIFF") and data[8:12] == b"WAVE":
+        return "audio/wav"
+    if data.startswith(b"OggS"):
+        return "audio/ogg"
+    if data.startswith(b"fLaC"):
+        return "audio/flac"
+    if data.startswith(b"ID3") or (len(data) >= 2 and data[0] == 0xFF and (data[1] & 0xE0) == 0xE0):
+        return "audio/mpeg"
+    if data.startswith(b"\x1A\x45\xDF\xA3"):
+        return "audio/webm"
+    if len(data) >= 12 and data[4:8] == b"ftyp":
+        return "audio/mp4"
+    return "application/octet-stream"
+
+
+def _duration_ms(data: bytes) -> Optional[int]:
+    if not _SOUNDFILE_AVAILABLE:
+        return None
+    try:
+        info = soundfile.info(io.BytesIO(data))
+        return int(info.frames * 1000 / info.samplerate) if info.samplerate else None
+    except Exception:
+        # Containers libsndfile can't parse (webm, mp4) simply have no duration
+        return None
+
+
+async def probe_audio(data: bytes) -> Tuple[str, Optional[int]]:
+    """Return ``(mime_type, duration_ms)`` for an audio clip."""
+    duration_ms = await asyncio.to_thread(_duration_ms, data)
+    return detect_mime_type(data), duration_ms
+
+
+async def store_audio(data: bytes) -> dict:
+    """Save a clip in the blob store; returns the column values for an Stt/Tts row."""
+    info = await get_blob_store().put(data)
+    mime_type, duration_ms = await probe_audio(data)
+    return {
+        "audio": None,
+        "audio_sha256": info.sha256,
+        "audio_size": info.size,
+        "audio_mime_type": mime_type,
+        "audio_duration_ms": duration_ms,
+    }
+
+
+async def load_audio(record) -> bytes:
+    """Audio bytes of an Stt/Tts row, from the blob store or the legacy column."""
+    if record.audio_sha256:
+        return await get_blob_store().get(record.audio_sha256)
+    return record.audio
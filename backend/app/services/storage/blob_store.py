@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Type
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class BlobInfo:
+    sha256: str
+    size: int
+    created: bool  # False when an identical blob was already stored
+
+
+class BlobStore(ABC):
+    """Content-addressed blob storage keyed by SHA-256 hex digest."""
+
+    @abstractmethod
+    async def put(self, data: bytes) -> BlobInfo:
+        ...
+
+    @abstractmethod
+    async def get(self, sha256: str) -> bytes:
+        ...
+
+    @abstractmethod
+    async def exists(self, sha256: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete(self, sha256: str) -> None:
+        ...
+
+    @abstractmethod
+    async def scan(self) -> List[Tuple[str, float]]:
+        """All stored blobs as ``(sha256, last_written)`` epoch timestamps."""
+
+    def local_path(self, sha256: str) -> Optional[str]:
+        """Filesystem path of a blob, for backends that keep blobs on local disk."""
+        return None
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs stored as files under ``root/ab/cd/<sha256>``.
+
+    Writes go to a temp file in the target directory and are renamed into
+    place, so a blob path is either absent or complete. Identical content
+    maps to the same path and is only written once.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, sha256: str) -> str:
+        if len(sha256) != 64 or any(c not in "0123456789abcdef" for c in sha256):
+            raise ValueError(f"Invalid blob digest: {sha256!r}")
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def _write(self, path: str, data: bytes) -> bool:
+        if os.path.exists(path):
+            # Refresh mtime so garbage collection's grace period covers the new reference
+            os.utime(path)
+            return False
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return True
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        with open(path, "rb") as blob:
+            return blob.read()
+
+    async def put(self, data: bytes) -> BlobInfo:
+        sha256 = hashlib.sha256(data).hexdigest()
+        created = await asyncio.to_thread(self._write, self._path(sha256), data)
+        return BlobInfo(sha256=sha256, size=len(data), created=created)
+
+    async def get(self, sha256: str) -> bytes:
+        try:
+            return await asyncio.to_thread(self._read, self._path(sha256))
+        except FileNotFoundError:
+            raise KeyError(sha256)
+
+    async def exists(self, sha256: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, self._path(sha256))
+
+    async def delete(self, sha256: str) -> None:
+        try:
+            await asyncio.to_thread(os.unlink, self._path(sha256))
+        except FileNotFoundError:
+            pass
+
+    def _scan(self) -> List[Tuple[str, float]]:
+        blobs = []
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if len(name) == 64 and not name.startswith(".tmp-"):
+                    blobs.append((name, os.path.getmtime(os.path.join(directory, name))))
+        return blobs
+
+    async def scan(self) -> List[Tuple[str, float]]:
+        return await asyncio.to_thread(self._scan)
+
+    def local_path(self, sha256: str) -> Optional[str]:
+        return self._path(sha256)
+
+
+BLOB_STORE_BACKENDS: Dict[str, Type[BlobStore]] = {
+    "local": LocalBlobStore,
+}
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Process-wide blob store for the configured BLOB_STORE_BACKEND."""
+    global _blob_store
+    if _blob_store is None:
+        backend = BLOB_STORE_BACKENDS.get(settings.BLOB_STORE_BACKEND)
+        if backend is None:
+            raise ValueError(f"Unknown blob store backend: {settings.BLOB_STORE_BACKEND}")
+        _blob_store = backend(settings.BLOB_STORE_PATH)
+    return _blob_store
@@ -0,0 +1,99 @@
+import hashlib
+import os
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+
+from app.core.http_cache import etag_matches
+from .blob_store import get_blob_store
+
+# Clips never change once stored; clients still revalidate with the ETag
+AUDIO_CACHE_CONTROL = "private, max-age=86400"
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive ``(start, end)`` of a single ``bytes=`` range.
+
+    Returns None for headers that should be ignored (malformed or
+    multi-range, which are answered with the full body) and raises
+    ValueError when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = (part.strip() for part in spec.partition("-"))
+    if not sep or not (first or last) or not (first or "0").isdigit() or not (last or "0").isdigit():
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError("empty suffix range")
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start > end and last:
+        return None
+    if start >= size:
+        raise ValueError("range starts past the end")
+    return start, min(end, size - 1)
+
+
+async def audio_response(
+    request: Request,
+    sha256: Optional[str],
+    mime_type: Optional[str],
+    data: Optional[bytes] = None,
+) -> Response:
+    """Raw audio response with ETag revalidation and single-range support.
+
+    ``sha256`` addresses a blob store entry; legacy rows pass their bytes as
+    ``data`` instead. Blobs on local disk are served by FileResponse, which
+    streams the file (or hands it to the server via ASGI pathsend) and
+    handles Range itself.
+    """
+    if sha256 is None:
+        if data is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio not found")
+        sha256 = hashlib.sha256(data).hexdigest()
+    etag = f'"{sha256}"'
+    media_type = mime_type or "application/octet-stream"
+    headers = {"ETag": etag, "Cache-Control": AUDIO_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if data is None:
+        store = get_blob_store()
+        path = store.local_path(sha256)
+        if path is not None and os.path.isfile(path):
+            return FileResponse(path, media_type=media_type, headers=headers)
+        try:
+            data = await store.get(sha256)
+        except KeyError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio not found")
+
+    size = len(data)
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    byte_range = None
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(
+                status_code=416,  # Range Not Satisfiable
+                headers={"Content-Range": f"bytes */{size}"}
+            )
+    if byte_range is None:
+        return Response(content=data, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return Response(
+        content=data[start:end + 1],
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers
+    )
@@ -0,0 +1,114 @@
+"""Move legacy STT/TTS audio into the blob store.
+
+    python -m app.services.storage.migrate_audio --batch-size 200
+    python -m app.services.storage.migrate_audio --gc --grace-hours 24
+    python -m app.services.storage.migrate_audio --restore
+
+Rows are migrated in batches, each committed on its own, so the job can be
+stopped and resumed. ``--gc`` removes blobs no row references any more; the
+grace period protects blobs written by requests whose rows are not committed
+yet. ``--restore`` copies blobs back into the audio column instead, which
+the bc83914b8fb2 downgrade requires first.
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select, union
+
+from app.core.database import AsyncSessionLocal
+from app.database.models import Stt, Tts
+from .audio import store_audio
+from .blob_store import get_blob_store
+
+logger = logging.getLogger(__name__)
+
+AUDIO_MODELS = (Stt, Tts)
+
+
+async def migrate_model(model, batch_size: int) -> int:
+    moved = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            result = await db.execute(
+                select(model)
+                .where(model.audio_sha256.is_(None), model.audio.is_not(None))
+                .order_by(model.id)
+                .limit(batch_size)
+            )
+            rows = result.scalars().all()
+            if not rows:
+                return moved
+            for row in rows:
+                for column, value in (await store_audio(row.audio)).items():
+                    setattr(row, column, value)
+            await db.commit()
+            # Drop the loaded audio bytes before fetching the next batch
+            db.expunge_all()
+            moved += len(rows)
+            logger.info(f"{model.__tablename__}: moved {moved} clips")
+
+
+async def restore_model(model, batch_size: int) -> int:
+    store = get_blob_store()
+    restored = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            result = await db.execute(
+                select(model)
+                .where(model.audio.is_(None), model.audio_sha256.is_not(None))
+                .order_by(model.id)
+                .limit(batch_size)
+            )
+            rows = result.scalars().all()
+            if not rows:
+                return restored
+            for row in rows:
+                row.audio = await store.get(row.audio_sha256)
+            await db.commit()
+            db.expunge_all()
+            restored += len(rows)
+            logger.info(f"{model.__tablename__}: restored {restored} clips")
+
+
+async def collect_garbage(grace_seconds: float) -> int:
+    store = get_blob_store()
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(union(*(
+            select(model.audio_sha256).where(model.audio_sha256.is_not(None))
+            for model in AUDIO_MODELS
+        )))
+        referenced = set(result.scalars().all())
+    cutoff = time.time() - grace_seconds
+    removed = 0
+    for sha256, written_at in await store.scan():
+        if sha256 not in referenced and written_at < cutoff:
+            await store.delete(sha256)
+            removed += 1
+    return removed
+
+
+async def main(batch_size: int, gc: bool, grace_hours: float, restore: bool):
+    if restore:
+        for model in AUDIO_MODELS:
+            restored = await restore_model(model, batch_size)
+            logger.info(f"{model.__tablename__}: {restored} clips copied back into the audio column")
+        return
+    for model in AUDIO_MODELS:
+        moved = await migrate_model(model, batch_size)
+        logger.info(f"{model.__tablename__}: {moved} clips moved to the blob store")
+    if gc:
+        removed = await collect_garbage(grace_hours * 3600)
+        logger.info(f"Removed {removed} unreferenced blobs")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--gc", action="store_true", help="Delete unreferenced blobs")
+    parser.add_argument("--grace-hours", type=float, default=24.0)
+    parser.add_argument("--restore", action="store_true", help="Copy blobs back into the audio column")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.gc, args.grace_hours, args.restore))
@@ -16,11 +16,21 @@ class AudioProcessor:
         self.max_duration = 300   # 5 minutes max (OpenAI limit)
     
     async def prepare_audio_for_openai(self, audio_data: str) -> str:
-        """Prepare audio data for OpenAI Whisper API."""
+        """Prepare base64-encoded audio data for OpenAI Whisper API."""
         try:
-            # Decode base64 audio
             audio_bytes = base64.b64decode(audio_data)
-            
+        except Exception as e:
+            logger.error(f"Error preparing audio for OpenAI: {e}")
+            return audio_data
+        processed_audio = await self.prepare_audio_bytes(audio_bytes)
+        if processed_audio is audio_bytes:
+            # Unchanged: hand back the caller's string instead of re-encoding it
+            return audio_data
+        return base64.b64encode(processed_audio).decode('utf-8')
+    
+    async def prepare_audio_bytes(self, audio_bytes: bytes) -> bytes:
+        """Prepare raw audio for OpenAI Whisper API (mono 16 kHz WAV); returns the input on failure."""
+        try:
             # Try to load audio with pydub (requires FFmpeg)
             try:
                 with io.BytesIO(audio_bytes) as audio_io:
@@ -35,7 +45,7 @@ class AudioProcessor:
                     # Fallback: return original audio data if FFmpeg is not available
                     # OpenAI Whisper can handle many formats directly
                     logger.info("Using fallback: returning original audio data")
-                    return audio_data
+                    return audio_bytes
             
             # Convert to mono if stereo
             if audio_segment.channels > 1:
@@ -54,16 +64,13 @@ class AudioProcessor:
             # Export as WAV
             output_io = io.BytesIO()
             audio_segment.export(output_io, format="wav")
-            processed_audio = output_io.getvalue()
-            
-            # Re-encode as base64
-            return base64.b64encode(processed_audio).decode('utf-8')
+            return output_io.getvalue()
             
         except Exception as e:
             logger.error(f"Error preparing audio for OpenAI: {e}")
             # Fallback: return original audio data
             logger.info("Using fallback: returning original audio data due to processing error")
-            return audio_data
+            return audio_bytes
     
     async def validate_audio_format(self, audio_data: str) -> bool:
         """Validate audio format and size."""
@@ -0,0 +1,85 @@
+"""Binary framing for the V2V WebSocket (subprotocol ``v2v.binary.v2``).
+
+Clients that offer the subprotocol send and receive audio as raw bytes in
+binary frames instead of base64 inside JSON; every other message stays a
+JSON text frame. A frame is::
+
+    version:u8  type:u8  codec:u8  reserved:u8  seq:u32  meta_len:u32   (network byte order)
+    meta:       meta_len bytes of UTF-8 JSON (the message's non-audio fields, may be empty)
+    payload:    audio bytes, to the end of the frame
+
+``voice_input`` meta carries ``language``/``stream``; ``voice_response`` and
+``audio_chunk`` meta carry the same fields as their JSON counterparts minus
+``audio_response``. Version 2 widened ``meta_len`` from u16: a long
+reply's transcript and lip-sync data easily exceed 64 KiB.
+"""
+import json
+import struct
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Optional
+
+SUBPROTOCOL = "v2v.binary.v2"
+VERSION = 2
+
+_HEADER = struct.Struct("!BBBBII")
+
+
+class FrameType(IntEnum):
+    VOICE_INPUT = 1
+    VOICE_RESPONSE = 2
+    AUDIO_CHUNK = 3
+
+
+class Codec(IntEnum):
+    UNKNOWN = 0
+    WEBM = 1
+    OGG = 2
+    WAV = 3
+    MP3 = 4
+    MP4 = 5
+
+    @property
+    def format_name(self) -> Optional[str]:
+        """Container name as understood by ``OpenAIClient.speech_to_text_bytes``."""
+        return None if self is Codec.UNKNOWN else self.name.lower()
+
+
+@dataclass(frozen=True)
+class Frame:
+    type: FrameType
+    seq: int
+    codec: Codec
+    payload: bytes
+    meta: dict = field(default_factory=dict)
+
+
+def encode_frame(frame_type: FrameType, seq: int, codec: Codec, payload: bytes, meta: Optional[dict] = None) -> bytes:
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8") if meta else b""
+    header = _HEADER.pack(VERSION, frame_type, codec, 0, seq, len(meta_bytes))
+    return b"".join((header, meta_bytes, payload))
+
+
+def decode_frame(data: bytes) -> Frame:
+    """Parse a binary frame; raises ValueError for anything malformed."""
+    if len(data) < _HEADER.size:
+        raise ValueError("Binary frame shorter than its header")
+    version, frame_type, codec, _, seq, meta_len = _HEADER.unpack_from(data)
+    if version != VERSION:
+        raise ValueError(f"Unsupported binary frame version {version}")
+    try:
+        frame_type, codec = FrameType(frame_type), Codec(codec)
+    except ValueError as e:
+        raise ValueError(f"Unknown binary frame field: {e}")
+    meta_end = _HEADER.size + meta_len
+    if len(data) < meta_end:
+        raise ValueError("Binary frame metadata is truncated")
+    meta = {}
+    if meta_len:
+        try:
+            meta = json.loads(data[_HEADER.size:meta_end])
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise ValueError("Binary frame metadata is not valid JSON")
+        if not isinstance(meta, dict):
+            raise ValueError("Binary frame metadata must be a JSON object")
+    return Frame(type=frame_type, seq=seq, codec=codec, payload=data[meta_end:], meta=meta)
@@ -1,5 +1,6 @@
+import json
 import logging
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict
 
 import httpx
 
@@ -74,27 +75,31 @@ class GroqClient:
         except Exception as e:
             logger.warning(f"Async model validation failed: {e}")
 
+    def _build_messages(self, user_input: str, user_id: str, user_sessions: Dict[str, Any], custom_system_prompt: str = None) -> list:
+        session = user_sessions.get(user_id, {})
+        conversation_history = session.get("conversation_history", [])
+
+        system_prompt = custom_system_prompt or "You are a helpful AI assistant. You must respond in Kazakh language (қазақ тілі). All your responses should be in Kazakh, using proper Kazakh grammar and vocabulary. Respond naturally and conversationally. Keep responses concise but helpful."
+        
+        messages = [
+            {
+                "role": "system",
+                "content": system_prompt,
+            }
+        ]
+        for exchange in conversation_history[-10:]:
+            messages.append({"role": "user", "content": exchange.get("user_input", "")})
+            messages.append({"role": "assistant", "content": exchange.get("ai_response", "")})
+        messages.append({"role": "user", "content": user_input})
+        return messages
+
     async def generate_response(self, user_input: str, user_id: str, user_sessions: Dict[str, Any], custom_system_prompt: str = None) -> str:
         """Generate AI response using Groq's llama-3.1-70b-versatile (configurable)."""
         try:
             if not self.api_key:
                 raise ValueError("GROQ_API_KEY is not set")
             
-            session = user_sessions.get(user_id, {})
-            conversation_history = session.get("conversation_history", [])
-
-            system_prompt = custom_system_prompt or "You are a helpful AI assistant. You must respond in Kazakh language (қазақ тілі). All your responses should be in Kazakh, using proper Kazakh grammar and vocabulary. Respond naturally and conversationally. Keep responses concise but helpful."
-            
-            messages = [
-                {
-                    "role": "system",
-                    "content": system_prompt,
-                }
-            ]
-            for exchange in conversation_history[-10:]:
-                messages.append({"role": "user", "content": exchange.get("user_input", "")})
-                messages.append({"role": "assistant", "content": exchange.get("ai_response", "")})
-            messages.append({"role": "user", "content": user_input})
+            messages = self._build_messages(user_input, user_id, user_sessions, custom_system_prompt)
 
             payload = {
                 "model": self.model,
@@ -125,6 +130,35 @@ class GroqClient:
             logger.error(f"Groq generate_response error: {e}")
             raise ValueError(f"AI response generation failed: {e}")
 
+    async def stream_response(self, user_input: str, user_id: str, user_sessions: Dict[str, Any], custom_system_prompt: str = None) -> AsyncIterator[str]:
+        """Like ``generate_response`` but yields content deltas as Groq streams them (SSE)."""
+        if not self.api_key:
+            raise ValueError("GROQ_API_KEY is not set")
+
+        payload = {
+            "model": self.model,
+            "messages": self._build_messages(user_input, user_id, user_sessions, custom_system_prompt),
+            "max_tokens": 150,
+            "temperature": 0.7,
+            "stream": True,
+        }
+
+        async with self._client.stream("POST", "/chat/completions", json=payload) as resp:
+            if resp.status_code != 200:
+                error_text = (await resp.aread()).decode(errors="replace")
+                logger.error(f"Groq API error {resp.status_code}: {error_text}")
+                raise ValueError(f"Groq API error {resp.status_code}: {error_text}")
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                content = choices[0].get("delta", {}).get("content") if choices else None
+                if content:
+                    yield content
+
     async def validate_api_key(self) -> bool:
         try:
             # Minimal call to verify auth; list models endpoint
@@ -1,7 +1,7 @@
 import logging
 import base64
 import io
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any
 import io
 import base64
 import logging
@@ -32,39 +32,43 @@ class OpenAIClient:
         self.tts_model = settings.OPENAI_TTS_MODEL
         self.stt_model = settings.OPENAI_STT_MODEL
     
-    async def generate_response(self, user_input: str, user_id: str, user_sessions: Dict, custom_system_prompt: str = None) -> str:
-        """Generate AI response using OpenAI GPT model."""
-        try:
-            # Get conversation context
-            session = user_sessions.get(user_id, {})
-            conversation_history = session.get("conversation_history", [])
-            
-            # Build conversation context
-            system_prompt = custom_system_prompt or "You are a helpful AI assistant. You must respond in Kazakh language (қазақ тілі). All your responses should be in Kazakh, using proper Kazakh grammar and vocabulary. Respond naturally and conversationally. Keep responses concise but helpful."
-            
-            messages = [
-                {
-                    "role": "system",
-                    "content": system_prompt
-                }
-            ]
-            
-            # Add recent conversation history (last 10 exchanges)
-            for exchange in conversation_history[-10:]:
-                messages.append({
-                    "role": "user",
-                    "content": exchange["user_input"]
-                })
-                messages.append({
-                    "role": "assistant",
-                    "content": exchange["ai_response"]
-                })
-            
-            # Add current user input
+    def _build_messages(self, user_input: str, user_id: str, user_sessions: Dict, custom_system_prompt: str = None) -> list:
+        # Get conversation context
+        session = user_sessions.get(user_id, {})
+        conversation_history = session.get("conversation_history", [])
+        
+        # Build conversation context
+        system_prompt = custom_system_prompt or "You are a helpful AI assistant. You must respond in Kazakh language (қазақ тілі). All your responses should be in Kazakh, using proper Kazakh grammar and vocabulary. Respond naturally and conversationally. Keep responses concise but helpful."
+        
+        messages = [
+            {
+                "role": "system",
+                "content": system_prompt
+            }
+        ]
+        
+        # Add recent conversation history (last 10 exchanges)
+        for exchange in conversation_history[-10:]:
             messages.append({
                 "role": "user",
-                "content": user_input
+                "content": exchange["user_input"]
+            })
+            messages.append({
+                "role": "assistant",
+                "content": exchange["ai_response"]
             })
+        
+        # Add current user input
+        messages.append({
+            "role": "user",
+            "content": user_input
+        })
+        return messages
+    
+    async def generate_response(self, user_input: str, user_id: str, user_sessions: Dict, custom_system_prompt: str = None) -> str:
+        """Generate AI response using OpenAI GPT model."""
+        try:
+            messages = self._build_messages(user_input, user_id, user_sessions, custom_system_prompt)
             
             response = await self.client.chat.completions.create(
                 model=self.gpt_model,
@@ -79,19 +83,39 @@ class OpenAIClient:
             logger.error(f"Error generating AI response: {e}")
             raise ValueError(f"AI response generation failed: {e}")
     
+    async def stream_response(self, user_input: str, user_id: str, user_sessions: Dict, custom_system_prompt: str = None) -> AsyncIterator[str]:
+        """Like ``generate_response`` but yields content deltas as they are generated."""
+        stream = await self.client.chat.completions.create(
+            model=self.gpt_model,
+            messages=self._build_messages(user_input, user_id, user_sessions, custom_system_prompt),
+            max_tokens=150,
+            temperature=0.7,
+            stream=True
+        )
+        async for chunk in stream:
+            content = chunk.choices[0].delta.content if chunk.choices else None
+            if content:
+                yield content
+    
     async def speech_to_text(self, audio_data: str) -> str:
+        """Convert base64-encoded speech to text; see ``speech_to_text_bytes``."""
+        try:
+            logger.info(f"Starting speech-to-text, audio data length: {len(audio_data)}")
+            audio_bytes = base64.b64decode(audio_data)
+        except Exception as e:
+            logger.error(f"Error in speech-to-text: {e}")
+            raise ValueError(f"Speech-to-text failed: {e}")
+        return await self.speech_to_text_bytes(audio_bytes)
+    
+    async def speech_to_text_bytes(self, audio_bytes: bytes, format_hint: str | None = None) -> str:
         """Convert speech to text using OpenAI Whisper with robust format detection.
 
-        Accepts base64-encoded audio and detects container/codec by magic bytes to set a
-        correct filename/extension that the API accepts. Falls back to transcoding to WAV
-        when the container cannot be reliably detected.
+        Detects container/codec by magic bytes to set a correct filename/extension that
+        the API accepts, then trusts ``format_hint`` (e.g. the codec a binary WebSocket
+        frame declared). Falls back to transcoding to WAV when neither is available.
         """
         try:
-            logger.info(f"Starting speech-to-text, audio data length: {len(audio_data)}")
-
-            # Decode base64 audio
-            audio_bytes = base64.b64decode(audio_data)
-            logger.info(f"Decoded audio bytes length: {len(audio_bytes)}")
+            logger.info(f"Audio bytes length: {len(audio_bytes)}")
 
             def detect_format(buf: bytes) -> str | None:
                 # WAV: RIFF....WAVE
@@ -111,7 +135,7 @@ class OpenAIClient:
                     return "mp4"
                 return None
 
-            detected = detect_format(audio_bytes)
+            detected = detect_format(audio_bytes) or format_hint
             logger.info(f"Detected audio format: {detected or 'unknown'}")
 
             # If unknown, try to transcode to WAV as a safe fallback
@@ -154,7 +178,12 @@ class OpenAIClient:
             raise ValueError(f"Speech-to-text failed: {e}")
     
     async def text_to_speech(self, text: str, language: str = "kk") -> str:
-        """Convert text to speech using OpenAI TTS."""
+        """Convert text to speech using OpenAI TTS; base64-encoded MP3 for JSON transport."""
+        audio_bytes = await self.text_to_speech_bytes(text, language)
+        return base64.b64encode(audio_bytes).decode('utf-8')
+    
+    async def text_to_speech_bytes(self, text: str, language: str = "kk") -> bytes:
+        """Convert text to speech using OpenAI TTS; raw MP3 bytes."""
         try:
             # Validate text length (OpenAI TTS has limits)
             if len(text) > 4096:
@@ -177,12 +206,7 @@ class OpenAIClient:
                 speed=1.5  # Speed multiplier (0.25 to 4.0)
             )
             
-            # Convert response to base64
-            audio_bytes = response.read()
-            
-            # Encode as base64 for WebSocket transmission
-            audio_b64 = base64.b64encode(audio_bytes).decode('utf-8')
-            return audio_b64
+            return response.read()
             
         except Exception as e:
             logger.error(f"Error in text-to-speech: {e}")
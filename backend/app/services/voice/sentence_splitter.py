@@ -0,0 +1,43 @@
+import re
+from typing import AsyncIterator, Optional
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by whitespace,
+# or a line break. Requiring the whitespace keeps "3.5" and "т.б." mid-token intact.
+_BOUNDARY = re.compile(r'[.!?…]+["»”)\]]*\s+|\n+')
+_CLAUSE_BREAKS = (", ", "; ", ": ", " — ", " - ")
+
+
+def _find_cut(buffer: str, min_chars: int, max_chars: int) -> Optional[int]:
+    for match in _BOUNDARY.finditer(buffer):
+        if len(buffer[:match.start()].strip()) >= min_chars:
+            return match.end()
+    if len(buffer) > max_chars:
+        # A run-on sentence: cut at the last clause break, else the last space, inside the limit
+        window = buffer[:max_chars]
+        cut = max(window.rfind(brk) + len(brk) for brk in _CLAUSE_BREAKS)
+        if cut <= min_chars:
+            cut = window.rfind(" ") + 1
+        return cut if cut > 0 else max_chars
+    return None
+
+
+async def split_sentences(tokens: AsyncIterator[str], min_chars: int, max_chars: int) -> AsyncIterator[str]:
+    """Regroup streamed LLM tokens into sentences as soon as each one is complete.
+
+    Fragments shorter than ``min_chars`` are merged into the next sentence and
+    anything longer than ``max_chars`` without a sentence end is cut at a
+    clause break, so each piece is a sensible unit for a TTS request.
+    """
+    buffer = ""
+    async for token in tokens:
+        buffer += token
+        while True:
+            cut = _find_cut(buffer, min_chars, max_chars)
+            if cut is None:
+                break
+            sentence, buffer = buffer[:cut].strip(), buffer[cut:]
+            if sentence:
+                yield sentence
+    tail = buffer.strip()
+    if tail:
+        yield tail
@@ -1,6 +1,9 @@
+import asyncio
+import base64
 import json
 import logging
-from typing import Dict, Optional, Any
+import time
+from typing import AsyncIterator, Dict, Optional, Any
 from datetime import datetime
 from fastapi import WebSocket
 
@@ -9,6 +12,8 @@ from app.api.v1.endpoints.location.schema import LocationContext
 from .openai_client import OpenAIClient
 from .groq_client import GroqClient
 from .audio_processor import AudioProcessor
+from .binary_protocol import Codec, FrameType, decode_frame, encode_frame
+from .sentence_splitter import split_sentences
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -24,21 +29,23 @@ class V2VWebSocketService:
         self.active_connections: Dict[str, WebSocket] = {}
         self.user_sessions: Dict[str, Dict[str, Any]] = {}
         
-    async def connect(self, websocket: WebSocket, user_id: str):
-        """Handle new WebSocket connection."""
+    async def connect(self, websocket: WebSocket, user_id: str, binary: bool = False):
+        """Handle new WebSocket connection; ``binary`` when the client negotiated binary audio frames."""
         try:
             self.active_connections[user_id] = websocket
             self.user_sessions[user_id] = {
                 "connected_at": datetime.utcnow(),
                 "conversation_history": [],
                 "is_processing": False,
-                "location_context": None
+                "location_context": None,
+                "binary": binary
             }
             
             await websocket.send_text(json.dumps({
                 "type": "connection_status",
                 "status": "connected",
-                "message": "V2V connection established"
+                "message": "V2V connection established",
+                "protocol": "binary" if binary else "json"
             }))
             
             logger.info(f"User {user_id} connected to V2V service")
@@ -100,6 +107,35 @@ class V2VWebSocketService:
                 "message": f"Internal server error: {str(e)}"
             }))
     
+    async def handle_binary_message(self, websocket: WebSocket, user_id: str, message: bytes):
+        """Handle a binary frame: voice input as raw audio bytes plus JSON metadata."""
+        try:
+            frame = decode_frame(message)
+        except ValueError as e:
+            await websocket.send_text(json.dumps({
+                "type": "error",
+                "message": f"Invalid binary frame: {e}"
+            }))
+            return
+        if frame.type != FrameType.VOICE_INPUT:
+            await websocket.send_text(json.dumps({
+                "type": "error",
+                "message": f"Unexpected binary frame type: {frame.type.name.lower()}"
+            }))
+            return
+        
+        data = dict(frame.meta)
+        data.update({"type": "voice_input", "audio_bytes": frame.payload, "audio_format": frame.codec.format_name})
+        await self.process_voice_input(websocket, user_id, data)
+    
+    async def _send_audio_message(self, websocket: WebSocket, user_id: str, message: Dict, audio: bytes, frame_type: FrameType, seq: int = 0):
+        """Send a message carrying TTS audio: one binary frame on binary sessions, else JSON with base64."""
+        # Only the connection that negotiated binary frames gets them (not e.g. the REST /text mock socket)
+        if self.active_connections.get(user_id) is websocket and self.user_sessions.get(user_id, {}).get("binary"):
+            await websocket.send_bytes(encode_frame(frame_type, seq, Codec.MP3, audio, message))
+        else:
+            await websocket.send_text(json.dumps({**message, "audio_response": base64.b64encode(audio).decode("utf-8")}))
+    
     async def process_voice_input(self, websocket: WebSocket, user_id: str, data: Dict):
         """Process voice input and generate voice response with lip-sync data."""
         try:
@@ -111,6 +147,7 @@ class V2VWebSocketService:
                 return
             
             self.user_sessions[user_id]["is_processing"] = True
+            started = time.perf_counter()
             
             # Send processing status
             await websocket.send_text(json.dumps({
@@ -119,26 +156,37 @@ class V2VWebSocketService:
                 "message": "Processing voice input..."
             }))
             
-            # Extract audio data and language
-            audio_data = data.get("audio_data")
+            # Extract audio (raw bytes from a binary frame, or base64 from JSON) and language
+            audio_bytes = data.get("audio_bytes")
+            if audio_bytes is None and data.get("audio_data"):
+                audio_bytes = base64.b64decode(data["audio_data"])
+            audio_format = data.get("audio_format")
             language = data.get("language", "kk")  # Default to Kazakh
-            if not audio_data:
+            if not audio_bytes:
                 raise ValueError("No audio data provided")
             
             # Update language preference
             self.user_sessions[user_id]["language"] = language
             
-            logger.info(f"Processing voice input for user {user_id}, audio data length: {len(audio_data) if audio_data else 0}")
+            logger.info(f"Processing voice input for user {user_id}, audio bytes: {len(audio_bytes)}")
             
             # Try to process audio through audio processor, fallback to direct processing
             try:
-                processed_audio = await self.audio_processor.prepare_audio_for_openai(audio_data)
+                processed_audio = await self.audio_processor.prepare_audio_bytes(audio_bytes)
                 # Process audio and convert to text using OpenAIClient
-                transcript = await self.openai_client.speech_to_text(processed_audio)
+                transcript = await self.openai_client.speech_to_text_bytes(processed_audio, audio_format)
             except Exception as audio_processing_error:
                 logger.warning(f"Audio processing failed, using direct approach: {audio_processing_error}")
                 # Fallback: send audio directly to OpenAI (it can handle WebM)
-                transcript = await self.openai_client.speech_to_text(audio_data)
+                transcript = await self.openai_client.speech_to_text_bytes(audio_bytes, audio_format)
+            
+            if data.get("stream"):
+                await websocket.send_text(json.dumps({
+                    "type": "transcript",
+                    "transcript": transcript
+                }))
+                await self.stream_voice_response(websocket, user_id, transcript, "voice", started)
+                return
             
             # Generate AI response using Groq LLM with OpenAI fallback
             try:
@@ -156,7 +204,7 @@ class V2VWebSocketService:
             
             # Convert AI response to speech
             language = self.user_sessions[user_id].get("language", "kk")
-            audio_response = await self.openai_client.text_to_speech(ai_response, language)
+            audio_response = await self.openai_client.text_to_speech_bytes(ai_response, language)
             
             # Generate lip-sync data for the AI response
             lip_sync_data = await self.generate_lip_sync_data(ai_response)
@@ -170,14 +218,13 @@ class V2VWebSocketService:
             })
             
             # Send response with lip-sync data
-            await websocket.send_text(json.dumps({
+            await self._send_audio_message(websocket, user_id, {
                 "type": "voice_response",
                 "transcript": transcript,
                 "ai_response": ai_response,
-                "audio_response": audio_response,
                 "lip_sync_data": lip_sync_data,
                 "timestamp": datetime.utcnow().isoformat()
-            }))
+            }, audio_response, FrameType.VOICE_RESPONSE)
             
         except Exception as e:
             logger.error(f"Error processing voice input for user {user_id}: {e}")
@@ -226,6 +273,10 @@ class V2VWebSocketService:
             # Update language preference
             self.user_sessions[user_id]["language"] = language
             
+            if data.get("stream"):
+                await self.stream_voice_response(websocket, user_id, text_input, "text", time.perf_counter())
+                return
+            
             # Generate AI response using Groq LLM with OpenAI fallback
             try:
                 system_prompt = self._get_location_aware_prompt(user_id)
@@ -242,7 +293,7 @@ class V2VWebSocketService:
             
             # Convert AI response to speech
             language = self.user_sessions[user_id].get("language", "kk")
-            audio_response = await self.openai_client.text_to_speech(ai_response, language)
+            audio_response = await self.openai_client.text_to_speech_bytes(ai_response, language)
             
             # Generate lip-sync data for the AI response
             lip_sync_data = await self.generate_lip_sync_data(ai_response)
@@ -256,14 +307,13 @@ class V2VWebSocketService:
             })
             
             # Send response with lip-sync data
-            await websocket.send_text(json.dumps({
+            await self._send_audio_message(websocket, user_id, {
                 "type": "voice_response",
                 "transcript": text_input,
                 "ai_response": ai_response,
-                "audio_response": audio_response,
                 "lip_sync_data": lip_sync_data,
                 "timestamp": datetime.utcnow().isoformat()
-            }))
+            }, audio_response, FrameType.VOICE_RESPONSE)
             
         except Exception as e:
             logger.error(f"Error processing text input for user {user_id}: {e}")
@@ -278,6 +328,97 @@ class V2VWebSocketService:
         finally:
             self.user_sessions[user_id]["is_processing"] = False
     
+    async def _stream_ai_response(self, user_input: str, user_id: str) -> AsyncIterator[str]:
+        """LLM reply tokens from Groq, falling back to OpenAI if Groq fails before its first token."""
+        system_prompt = self._get_location_aware_prompt(user_id)
+        started = False
+        try:
+            async for token in self.groq_client.stream_response(user_input, user_id, self.user_sessions, system_prompt):
+                started = True
+                yield token
+            return
+        except Exception as groq_error:
+            if started:
+                # Part of the reply is already being spoken; switching models mid-answer would not fit
+                raise
+            logger.warning(f"Groq streaming failed, falling back to OpenAI: {groq_error}")
+        async for token in self.openai_client.stream_response(user_input, user_id, self.user_sessions, system_prompt):
+            yield token
+    
+    async def stream_voice_response(self, websocket: WebSocket, user_id: str, user_input: str, input_type: str, started: float):
+        """Speak the reply sentence by sentence while the LLM is still generating it.
+
+        Each completed sentence is sent to TTS right away (at most
+        V2V_STREAM_TTS_CONCURRENCY at once) and the results are emitted in
+        order as ``audio_chunk`` messages, so the first audio only waits for
+        the first sentence. A ``voice_response_end`` message closes the reply.
+        """
+        language = self.user_sessions[user_id].get("language", "kk")
+        semaphore = asyncio.Semaphore(settings.V2V_STREAM_TTS_CONCURRENCY)
+        pending: asyncio.Queue = asyncio.Queue()
+        sentences = []
+        
+        async def synthesize(sentence: str):
+            async with semaphore:
+                audio = await self.openai_client.text_to_speech_bytes(sentence, language)
+            return audio, await self.generate_lip_sync_data(sentence)
+        
+        async def produce():
+            try:
+                async for sentence in split_sentences(
+                    self._stream_ai_response(user_input, user_id),
+                    settings.V2V_STREAM_MIN_SENTENCE_CHARS,
+                    settings.V2V_STREAM_MAX_SENTENCE_CHARS
+                ):
+                    sentences.append(sentence)
+                    await pending.put((sentence, asyncio.create_task(synthesize(sentence))))
+            finally:
+                await pending.put(None)
+        
+        producer = asyncio.create_task(produce())
+        seq = 0
+        first_audio_ms = None
+        try:
+            while (item := await pending.get()) is not None:
+                sentence, task = item
+                audio, lip_sync_data = await task
+                if first_audio_ms is None:
+                    first_audio_ms = int((time.perf_counter() - started) * 1000)
+                    logger.info(f"First V2V audio for user {user_id} after {first_audio_ms} ms")
+                await self._send_audio_message(websocket, user_id, {
+                    "type": "audio_chunk",
+                    "seq": seq,
+                    "text": sentence,
+                    "lip_sync_data": lip_sync_data
+                }, audio, FrameType.AUDIO_CHUNK, seq)
+                seq += 1
+            # Surfaces LLM errors raised after the last sentence was queued
+            await producer
+        except BaseException:
+            producer.cancel()
+            while not pending.empty():
+                item = pending.get_nowait()
+                if item is not None:
+                    item[1].cancel()
+            raise
+        
+        ai_response = " ".join(sentences)
+        self.user_sessions[user_id]["conversation_history"].append({
+            "timestamp": datetime.utcnow().isoformat(),
+            "user_input": user_input,
+            "ai_response": ai_response,
+            "type": input_type
+        })
+        
+        await websocket.send_text(json.dumps({
+            "type": "voice_response_end",
+            "transcript": user_input,
+            "ai_response": ai_response,
+            "chunks": seq,
+            "first_audio_ms": first_audio_ms,
+            "timestamp": datetime.utcnow().isoformat()
+        }))
+    
     async def generate_lip_sync_data(self, text: str) -> Dict[str, Any]:
         """Generate lip-sync data for TalkingHead avatar."""
         try:
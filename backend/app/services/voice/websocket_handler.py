@@ -2,6 +2,7 @@ import json
 import logging
 from fastapi import WebSocket, WebSocketDisconnect
 
+from .binary_protocol import SUBPROTOCOL
 from .v2v_service import v2v_service
 
 logger = logging.getLogger(__name__)
@@ -10,8 +11,9 @@ logger = logging.getLogger(__name__)
 async def v2v_websocket_handler(websocket: WebSocket, user_id: str):
     """Main WebSocket handler for V2V service."""
     try:
-        # Accept the WebSocket connection
-        await websocket.accept()
+        # Accept the WebSocket connection; clients offering the binary subprotocol get raw audio frames
+        binary = SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+        await websocket.accept(subprotocol=SUBPROTOCOL if binary else None)
         
         # Basic validation - user_id should be a valid format
         if not user_id or user_id.strip() == "":
@@ -19,16 +21,21 @@ async def v2v_websocket_handler(websocket: WebSocket, user_id: str):
             return
         
         # Connect user to V2V service
-        await v2v_service.connect(websocket, user_id)
+        await v2v_service.connect(websocket, user_id, binary=binary)
         
         # Handle WebSocket messages
         while True:
             try:
-                # Receive message
-                message = await websocket.receive_text()
+                # Receive message: JSON control messages as text, audio as binary frames
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
                 
                 # Handle the message
-                await v2v_service.handle_message(websocket, user_id, message)
+                if message.get("bytes") is not None:
+                    await v2v_service.handle_binary_message(websocket, user_id, message["bytes"])
+                else:
+                    await v2v_service.handle_message(websocket, user_id, message.get("text") or "")
                 
             except WebSocketDisconnect:
                 logger.info(f"WebSocket disconnected for user {user_id}")
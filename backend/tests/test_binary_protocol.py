@@ -0,0 +1,33 @@
+import pytest
+
+from app.services.voice.binary_protocol import Codec, FrameType, decode_frame, encode_frame
+
+
+def test_round_trip():
+    frame = decode_frame(encode_frame(FrameType.AUDIO_CHUNK, 7, Codec.MP3, b"\x00\xffaudio", {"index": 3}))
+
+    assert (frame.type, frame.seq, frame.codec) == (FrameType.AUDIO_CHUNK, 7, Codec.MP3)
+    assert frame.payload == b"\x00\xffaudio"
+    assert frame.meta == {"index": 3}
+
+
+def test_round_trip_large_meta():
+    # A long reply's lip-sync data runs well past 64 KiB of JSON
+    meta = {
+        "transcript": "привет " * 2000,
+        "ai_response": "hello " * 5000,
+        "lip_sync_data": [{"time": i / 100, "viseme": "A", "intensity": 0.5} for i in range(5000)],
+    }
+    data = encode_frame(FrameType.VOICE_RESPONSE, 1, Codec.MP3, b"mp3", meta)
+    frame = decode_frame(data)
+
+    assert len(data) > 65535
+    assert frame.meta == meta
+    assert frame.payload == b"mp3"
+
+
+def test_rejects_truncated_meta():
+    data = encode_frame(FrameType.VOICE_INPUT, 0, Codec.WEBM, b"", {"language": "en"})
+
+    with pytest.raises(ValueError):
+        decode_frame(data[:-1])
@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core import bulk
+
+
+def make_request(chunks, content_type="application/json"):
+    messages = [{"type": "http.request", "body": chunk, "more_body": True} for chunk in chunks]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {"type": "http", "method": "POST", "headers": [(b"content-type", content_type.encode())]}
+    return Request(scope, receive)
+
+
+def collect(request):
+    async def run():
+        return [item async for item in bulk.iter_bulk_items(request)]
+
+    return asyncio.run(run())
+
+
+def test_json_array_items():
+    body = json.dumps([{"text": "a"}, {"text": "b"}]).encode()
+
+    assert collect(make_request([body])) == [(0, {"text": "a"}, None), (1, {"text": "b"}, None)]
+
+
+def test_json_array_over_byte_limit_is_rejected(monkeypatch):
+    monkeypatch.setattr(bulk.settings, "BULK_INGEST_MAX_JSON_BYTES", 64)
+    body = json.dumps([{"text": "x" * 40}, {"text": "y" * 40}]).encode()
+
+    with pytest.raises(HTTPException) as exc_info:
+        collect(make_request([body[:50], body[50:]]))
+    assert exc_info.value.status_code == 413
+
+
+def test_ndjson_is_not_subject_to_json_byte_limit(monkeypatch):
+    monkeypatch.setattr(bulk.settings, "BULK_INGEST_MAX_JSON_BYTES", 16)
+    body = b'{"text": "aaaaaaaaaa"}\n{"text": "bbbbbbbbbb"}\n'
+
+    items = collect(make_request([body], "application/x-ndjson"))
+    assert [item for _, item, _ in items] == [{"text": "aaaaaaaaaa"}, {"text": "bbbbbbbbbb"}]
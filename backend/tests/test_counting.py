@@ -0,0 +1,54 @@
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import asyncpg, psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.v1.endpoints.stt.service import SEARCH_CONFIG
+from app.core.counting import _estimate, _explain_statement
+from app.database.models import Stt
+
+
+def search_query(text: str = "hello"):
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+    return select(Stt).where(
+        Stt.user_id == 1,
+        or_(Stt.search_vector.op("@@")(ts_query), Stt.text.icontains(text, autoescape=True))
+    )
+
+
+def filtered_query():
+    return select(Stt).where(Stt.user_id == 1, Stt.id.in_([1, 2, 3]))
+
+
+@pytest.mark.parametrize("dialect", [asyncpg.dialect(), psycopg2.dialect()], ids=["asyncpg", "psycopg2"])
+def test_explain_statement_binds_search_parameters(dialect):
+    sql, params = _explain_statement(search_query(), dialect)
+
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    values = list(params) if isinstance(params, tuple) else list(params.values())
+    assert SEARCH_CONFIG in values
+    assert "'simple'" not in sql
+
+
+def test_explain_statement_expands_in_lists():
+    sql, params = _explain_statement(filtered_query(), asyncpg.dialect())
+
+    assert "POSTCOMPILE" not in sql
+    assert params == (1, 1, 2, 3)
+
+
+@pytest.mark.skipif(not os.environ.get("TEST_DATABASE_URL"), reason="needs TEST_DATABASE_URL (migrated Postgres, asyncpg URL)")
+@pytest.mark.parametrize("build", [search_query, filtered_query], ids=["search", "filtered"])
+def test_estimate_returns_planner_rows(build):
+    async def run():
+        engine = create_async_engine(os.environ["TEST_DATABASE_URL"])
+        try:
+            async with AsyncSession(engine) as db:
+                return await _estimate(db, build(), "stts")
+        finally:
+            await engine.dispose()
+
+    assert isinstance(asyncio.run(run()), int)